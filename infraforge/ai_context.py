@@ -136,12 +136,9 @@ def _fetch_ipam(app: "InfraForgeApp") -> str:
         return "=== IPAM ===\n  Not configured\n"
 
     try:
-        from infraforge.ipam_client import IPAMClient
+        client = app.ipam_client
     except ImportError:
         return "=== IPAM ===\n  Not configured (ipam_client not available)\n"
-
-    try:
-        client = IPAMClient(app.config)
     except Exception as exc:
         return f"=== IPAM ===\n  Error: {exc}\n"
 
@@ -1,5 +1,7 @@
 """Main InfraForge Textual Application."""
 
+from dataclasses import astuple
+
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.screen import Screen
@@ -265,6 +267,36 @@ class InfraForgeApp(App):
         self.ai_client: AIClient | None = None
         self._connected = False
         self._start_screen = start_screen
+        # Long-lived DNS/IPAM clients, keyed by the config section they
+        # were built from so edits in the setup screen take effect.
+        self._dns_client = None
+        self._dns_client_key: tuple | None = None
+        self._ipam_client = None
+        self._ipam_client_key: tuple | None = None
+
+    @property
+    def dns_client(self):
+        """Shared DNSClient for the current DNS config."""
+        key = astuple(self.config.dns)
+        if self._dns_client is None or key != self._dns_client_key:
+            from infraforge.dns_client import DNSClient
+            self._dns_client = DNSClient.from_config(self.config)
+            self._dns_client_key = key
+        return self._dns_client
+
+    @property
+    def ipam_client(self):
+        """Shared IPAMClient for the current IPAM config.
+
+        Reusing one client keeps its HTTP session (and the TLS connection
+        to phpIPAM) alive between operations and screens.
+        """
+        key = astuple(self.config.ipam)
+        if self._ipam_client is None or key != self._ipam_client_key:
+            from infraforge.ipam_client import IPAMClient
+            self._ipam_client = IPAMClient(self.config)
+            self._ipam_client_key = key
+        return self._ipam_client
 
     def on_mount(self):
         for t in _CUSTOM_THEMES:
@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import threading
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from infraforge.config import Config
 
@@ -34,8 +36,14 @@ class IPAMClient:
         self._username = icfg.username
         self._password = icfg.password
         self._verify_ssl = icfg.verify_ssl
+        # The client is shared across worker threads; only one of them
+        # should log in when the session token is missing or expired.
+        self._auth_lock = threading.Lock()
         self._session = requests.Session()
         self._session.verify = self._verify_ssl
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, pool_block=False)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
 
         if not self._verify_ssl:
             import urllib3
@@ -53,7 +61,12 @@ class IPAMClient:
         """Ensure we have a valid API token."""
         if self._token:
             return
+        with self._auth_lock:
+            if not self._token:
+                self._login()
 
+    def _login(self) -> None:
+        """Obtain a session token; called with ``_auth_lock`` held."""
         if not self._username or not self._password:
             raise IPAMError(
                 "phpIPAM requires either an API token or username/password. "
@@ -134,61 +147,50 @@ class IPAMClient:
             "Content-Type": "application/json",
         }
 
-    def _get(self, endpoint: str, params: dict | None = None) -> Any:
-        """Perform a GET request against the phpIPAM API."""
+    def _request(self, method: str, endpoint: str, default: Any, **kwargs) -> Any:
+        """Perform a request against the phpIPAM API and unwrap ``data``.
+
+        Session tokens obtained from username/password expire after a
+        period of inactivity; since clients are long-lived, a 401 on a
+        user-auth client triggers one re-authentication and retry.
+        """
         url = f"{self.api_base}/{endpoint.lstrip('/')}"
         try:
-            resp = self._session.get(url, headers=self._headers(), params=params, timeout=15)
+            headers = self._headers()
+            resp = self._session.request(
+                method, url, headers=headers, timeout=15, **kwargs,
+            )
+            if resp.status_code == 401 and self._username and self._password:
+                with self._auth_lock:
+                    # Another thread may have re-authenticated already
+                    if self._token == headers["token"]:
+                        self._token = None
+                resp = self._session.request(
+                    method, url, headers=self._headers(), timeout=15, **kwargs,
+                )
             resp.raise_for_status()
             body = resp.json()
             if not body.get("success"):
                 raise IPAMError(f"phpIPAM API error: {body.get('message', 'unknown')}")
-            return body.get("data", [])
+            return body.get("data", default)
         except requests.RequestException as e:
             raise IPAMError(f"phpIPAM request failed ({endpoint}): {e}")
 
+    def _get(self, endpoint: str, params: dict | None = None) -> Any:
+        """Perform a GET request against the phpIPAM API."""
+        return self._request("GET", endpoint, [], params=params)
+
     def _post(self, endpoint: str, payload: dict | None = None) -> Any:
         """Perform a POST request against the phpIPAM API."""
-        url = f"{self.api_base}/{endpoint.lstrip('/')}"
-        try:
-            resp = self._session.post(
-                url, headers=self._headers(), json=payload or {}, timeout=15,
-            )
-            resp.raise_for_status()
-            body = resp.json()
-            if not body.get("success"):
-                raise IPAMError(f"phpIPAM API error: {body.get('message', 'unknown')}")
-            return body.get("data", {})
-        except requests.RequestException as e:
-            raise IPAMError(f"phpIPAM request failed ({endpoint}): {e}")
+        return self._request("POST", endpoint, {}, json=payload or {})
 
     def _patch(self, endpoint: str, payload: dict | None = None) -> Any:
         """Perform a PATCH request against the phpIPAM API."""
-        url = f"{self.api_base}/{endpoint.lstrip('/')}"
-        try:
-            resp = self._session.patch(
-                url, headers=self._headers(), json=payload or {}, timeout=15,
-            )
-            resp.raise_for_status()
-            body = resp.json()
-            if not body.get("success"):
-                raise IPAMError(f"phpIPAM API error: {body.get('message', 'unknown')}")
-            return body.get("data", {})
-        except requests.RequestException as e:
-            raise IPAMError(f"phpIPAM request failed ({endpoint}): {e}")
+        return self._request("PATCH", endpoint, {}, json=payload or {})
 
     def _delete(self, endpoint: str) -> Any:
         """Perform a DELETE request against the phpIPAM API."""
-        url = f"{self.api_base}/{endpoint.lstrip('/')}"
-        try:
-            resp = self._session.delete(url, headers=self._headers(), timeout=15)
-            resp.raise_for_status()
-            body = resp.json()
-            if not body.get("success"):
-                raise IPAMError(f"phpIPAM API error: {body.get('message', 'unknown')}")
-            return body.get("data", {})
-        except requests.RequestException as e:
-            raise IPAMError(f"phpIPAM request failed ({endpoint}): {e}")
+        return self._request("DELETE", endpoint, {})
 
     # ------------------------------------------------------------------
     # Sections
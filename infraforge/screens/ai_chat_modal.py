@@ -521,9 +521,7 @@ class AIChatModal(ModalScreen):
 
     def _exec_ipam(self, name: str, inputs: dict) -> str:
         """Handle IPAM mutation tools."""
-        from infraforge.ipam_client import IPAMClient
-
-        client = IPAMClient(self.app.config)
+        client = self.app.ipam_client
 
         if name == "create_ipam_section":
             result = client.create_section(
@@ -679,9 +677,7 @@ class AIChatModal(ModalScreen):
 
     def _query_free_ips(self, inputs: dict) -> str:
         """Fetch available IPs in a subnet."""
-        from infraforge.ipam_client import IPAMClient
-
-        client = IPAMClient(self.app.config)
+        client = self.app.ipam_client
         subnet_id = inputs["subnet_id"]
         count = int(inputs.get("count", 10))
         ips = client.get_available_ips(subnet_id, count=count)
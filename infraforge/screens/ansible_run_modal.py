@@ -1362,8 +1362,7 @@ class AnsibleRunModal(ModalScreen):
                 dns_zones = list(getattr(dns_cfg, "zones", []) or [])
                 if not dns_zones and getattr(dns_cfg, "domain", ""):
                     dns_zones = [dns_cfg.domain]
-                from infraforge.dns_client import DNSClient
-                dns_client = DNSClient.from_config(self.app.config)
+                dns_client = self.app.dns_client
         except Exception:
             pass
         return dns_client, dns_zones
@@ -1787,16 +1786,14 @@ class AnsibleRunModal(ModalScreen):
         dns_cfg = getattr(self.app.config, "dns", None)
         if dns_cfg and getattr(dns_cfg, "server", ""):
             try:
-                from infraforge.dns_client import DNSClient
-                dns_client = DNSClient.from_config(self.app.config)
+                dns_client = self.app.dns_client
             except Exception:
                 pass
 
         ipam_cfg = getattr(self.app.config, "ipam", None)
         if ipam_cfg and getattr(ipam_cfg, "url", ""):
             try:
-                from infraforge.ipam_client import IPAMClient
-                ipam_client = IPAMClient(self.app.config)
+                ipam_client = self.app.ipam_client
             except Exception:
                 pass
 
@@ -2417,9 +2414,7 @@ class AnsibleRunModal(ModalScreen):
             self._set_status, "Loading IPAM subnets..."
         )
         try:
-            from infraforge.ipam_client import IPAMClient
-
-            client = IPAMClient(self.app.config)
+            client = self.app.ipam_client
             subnets = client.get_subnets()
             self._subnets = subnets
             self._ipam_loaded = True
@@ -2440,9 +2435,7 @@ class AnsibleRunModal(ModalScreen):
     @work(thread=True, exclusive=True, group="ansible-ipam")
     def _load_ipam_addresses(self, subnet_id: str) -> None:
         try:
-            from infraforge.ipam_client import IPAMClient
-
-            client = IPAMClient(self.app.config)
+            client = self.app.ipam_client
             addresses = client.get_subnet_addresses(subnet_id)
             ips = [a.get("ip", "") for a in addresses if a.get("ip")]
             if ips:
@@ -632,9 +632,9 @@ class DNSScreen(Screen):
         )
 
         try:
-            from infraforge.dns_client import DNSClient, DNSError
+            from infraforge.dns_client import DNSError
 
-            client = DNSClient.from_config(self.app.config)
+            client = self.app.dns_client
 
             # Health check
             healthy = client.check_health(zone_name)
@@ -1105,9 +1105,9 @@ class DNSScreen(Screen):
         )
 
         try:
-            from infraforge.dns_client import DNSClient, DNSError
+            from infraforge.dns_client import DNSError
 
-            client = DNSClient.from_config(self.app.config)
+            client = self.app.dns_client
             soa = client.check_zone(zone_name)
 
             if soa is None:
@@ -1215,9 +1215,9 @@ class DNSScreen(Screen):
             f"Creating {rtype} record {name} -> {value} ...",
         )
         try:
-            from infraforge.dns_client import DNSClient, DNSError
+            from infraforge.dns_client import DNSError
 
-            client = DNSClient.from_config(self.app.config)
+            client = self.app.dns_client
             client.create_record(name, rtype, value, ttl, zone)
 
             # Refresh cache
@@ -1285,9 +1285,9 @@ class DNSScreen(Screen):
             f"Updating record {name} ({rtype}) ...",
         )
         try:
-            from infraforge.dns_client import DNSClient, DNSError
+            from infraforge.dns_client import DNSError
 
-            client = DNSClient.from_config(self.app.config)
+            client = self.app.dns_client
 
             if old_record.name != name or old_record.rtype != rtype:
                 client.delete_record(
@@ -1352,9 +1352,9 @@ class DNSScreen(Screen):
             f"Deleting {record.rtype} record {record.name} ...",
         )
         try:
-            from infraforge.dns_client import DNSClient, DNSError
+            from infraforge.dns_client import DNSError
 
-            client = DNSClient.from_config(self.app.config)
+            client = self.app.dns_client
             client.delete_record(
                 record.name,
                 record.rtype,
@@ -1401,9 +1401,7 @@ class DNSScreen(Screen):
         )
 
         try:
-            from infraforge.dns_client import DNSClient
-
-            client = DNSClient.from_config(self.app.config)
+            client = self.app.dns_client
 
             hints = []
             if dns_cfg.domain:
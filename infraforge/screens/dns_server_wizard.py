@@ -1743,8 +1743,7 @@ class DNSServerWizardScreen(Screen):
         if not ipam_cfg.url:
             return
         try:
-            from infraforge.ipam_client import IPAMClient
-            ipam = IPAMClient(self.app.config)
+            ipam = self.app.ipam_client
             self._subnets = ipam.get_subnets()
             if self._step == 2:
                 self.app.call_from_thread(self._render_step)
@@ -1754,8 +1753,7 @@ class DNSServerWizardScreen(Screen):
     @work(thread=True)
     def _load_available_ips(self, subnet_id: str):
         try:
-            from infraforge.ipam_client import IPAMClient
-            ipam = IPAMClient(self.app.config)
+            ipam = self.app.ipam_client
             ips = ipam.get_available_ips(subnet_id)
             self._available_ips = ips
             if ips:
@@ -1821,8 +1819,7 @@ class DNSServerWizardScreen(Screen):
         if not dns_cfg.provider or not dns_cfg.server:
             return
         try:
-            from infraforge.dns_client import DNSClient
-            client = DNSClient.from_config(self.app.config)
+            client = self.app.dns_client
             zone = self.spec.dns_zone or dns_cfg.domain
             existing = client.lookup_record(
                 self.spec.dns_name, "A", zone,
@@ -2205,8 +2202,7 @@ class DNSServerWizardScreen(Screen):
             ):
                 log("[bold]Creating DNS record...[/bold]")
                 try:
-                    from infraforge.dns_client import DNSClient
-                    dns = DNSClient.from_config(self.app.config)
+                    dns = self.app.dns_client
                     zone = self.spec.dns_zone or dns_cfg.domain
                     result = dns.ensure_record(
                         self.spec.dns_name, "A",
@@ -2230,8 +2226,7 @@ class DNSServerWizardScreen(Screen):
             ):
                 log("[bold]Reserving IP in IPAM...[/bold]")
                 try:
-                    from infraforge.ipam_client import IPAMClient
-                    ipam = IPAMClient(self.app.config)
+                    ipam = self.app.ipam_client
                     ipam.create_address(
                         self.spec.ip_address,
                         self.spec.subnet_id,
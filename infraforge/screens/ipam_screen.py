@@ -398,9 +398,9 @@ class IPAMScreen(Screen):
         )
 
         try:
-            from infraforge.ipam_client import IPAMClient, IPAMError
+            from infraforge.ipam_client import IPAMError
 
-            client = IPAMClient(self.app.config)
+            client = self.app.ipam_client
 
             healthy = client.check_health()
             self._ipam_healthy = healthy
@@ -453,9 +453,9 @@ class IPAMScreen(Screen):
         self.app.call_from_thread(self._set_status, "Loading VLANs...")
 
         try:
-            from infraforge.ipam_client import IPAMClient, IPAMError
+            from infraforge.ipam_client import IPAMError
 
-            client = IPAMClient(self.app.config)
+            client = self.app.ipam_client
             vlans = client.get_vlans()
             self._vlans = vlans if isinstance(vlans, list) else []
 
@@ -567,9 +567,9 @@ class IPAMScreen(Screen):
         )
 
         try:
-            from infraforge.ipam_client import IPAMClient, IPAMError
+            from infraforge.ipam_client import IPAMError
 
-            client = IPAMClient(self.app.config)
+            client = self.app.ipam_client
             addresses = client.get_subnet_addresses(subnet_id)
             if not isinstance(addresses, list):
                 addresses = []
@@ -1248,9 +1248,9 @@ class IPAMScreen(Screen):
     ) -> None:
         suggested_ip = ""
         try:
-            from infraforge.ipam_client import IPAMClient, IPAMError
+            from infraforge.ipam_client import IPAMError
 
-            client = IPAMClient(self.app.config)
+            client = self.app.ipam_client
             suggested_ip = client.get_first_free_ip(subnet.get("id", ""))
         except Exception:
             pass
@@ -1280,9 +1280,9 @@ class IPAMScreen(Screen):
             f"Reserving {ip} in subnet...",
         )
         try:
-            from infraforge.ipam_client import IPAMClient, IPAMError
+            from infraforge.ipam_client import IPAMError
 
-            client = IPAMClient(self.app.config)
+            client = self.app.ipam_client
             tag_value = TAG_VALUES.get(tag_label, 2)
             client.create_address(
                 ip=ip,
@@ -1352,9 +1352,9 @@ class IPAMScreen(Screen):
             f"Updating {addr.get('ip', '?')}...",
         )
         try:
-            from infraforge.ipam_client import IPAMClient, IPAMError
+            from infraforge.ipam_client import IPAMError
 
-            client = IPAMClient(self.app.config)
+            client = self.app.ipam_client
             tag_value = TAG_VALUES.get(result["tag"], 2)
             payload = {
                 "hostname": result["hostname"],
@@ -1420,9 +1420,9 @@ class IPAMScreen(Screen):
             self._set_status, f"Releasing {ip}...",
         )
         try:
-            from infraforge.ipam_client import IPAMClient, IPAMError
+            from infraforge.ipam_client import IPAMError
 
-            client = IPAMClient(self.app.config)
+            client = self.app.ipam_client
             client._delete(f"/addresses/{addr_id}/")
 
             self.app.call_from_thread(
@@ -1478,9 +1478,9 @@ class IPAMScreen(Screen):
             f"Enabling scan on {subnet_cidr}...",
         )
         try:
-            from infraforge.ipam_client import IPAMClient, IPAMError
+            from infraforge.ipam_client import IPAMError
 
-            client = IPAMClient(self.app.config)
+            client = self.app.ipam_client
             client.enable_subnet_scanning(subnet_id)
 
             self.app.call_from_thread(
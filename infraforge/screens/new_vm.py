@@ -72,6 +72,7 @@ class NewVMScreen(Screen):
         self._post_deploy = False
         self._post_deploy_running = False
         self._available_playbooks: list[PlaybookInfo] = []
+        self._post_deploy_items_cache: list[WizItem] = []
         self._initial_template = template_name
         self._saved_templates: list[dict] = []
         self._data_loaded = False
@@ -1366,8 +1367,7 @@ class NewVMScreen(Screen):
         if not ipam_cfg.url:
             return
         try:
-            from infraforge.ipam_client import IPAMClient
-            ipam = IPAMClient(self.app.config)
+            ipam = self.app.ipam_client
             self._subnets = ipam.get_subnets()
             if self._step == 2:
                 self.app.call_from_thread(self._render_step)
@@ -1377,8 +1377,7 @@ class NewVMScreen(Screen):
     @work(thread=True)
     def _load_available_ips(self, subnet_id: str):
         try:
-            from infraforge.ipam_client import IPAMClient
-            ipam = IPAMClient(self.app.config)
+            ipam = self.app.ipam_client
             ips = ipam.get_available_ips(subnet_id)
             self._available_ips = ips
             if ips:
@@ -1448,8 +1447,7 @@ class NewVMScreen(Screen):
         if not dns_cfg.provider or not dns_cfg.server:
             return
         try:
-            from infraforge.dns_client import DNSClient
-            client = DNSClient.from_config(self.app.config)
+            client = self.app.dns_client
             zone = self.spec.dns_zone or dns_cfg.domain
             existing = client.lookup_record(self.spec.dns_name, "A", zone)
             self._dns_check_result = existing
@@ -1611,53 +1609,57 @@ class NewVMScreen(Screen):
                 return
             log("[green]  ✓ Providers cached[/green]\n")
 
-            log("[bold]Running terraform init...[/bold]")
-            ok, output = tf.terraform_init(deploy_dir)
-            if output.strip():
-                for line in output.strip().split("\n")[-5:]:
-                    log(f"[dim]  {line}[/dim]")
-            if not ok:
-                _fail("✗ terraform init failed!", output)
-                return
-            log("[green]  ✓ Init successful[/green]\n")
+            # init → plan → apply run as one streamed pipeline; init/plan
+            # output is buffered so only its tail is shown, apply streams.
+            progress_monitor = None
+            phase_tails = {"init": 5, "plan": 10}
+            phase_output: list[str] = []
 
-            log("[bold]Running terraform plan...[/bold]")
-            ok, output = tf.terraform_plan(deploy_dir)
-            if output.strip():
-                for line in output.strip().split("\n")[-10:]:
+            def _log_tail(phase: str):
+                lines = [ln for ln in phase_output if ln.strip()]
+                for line in lines[-phase_tails[phase]:]:
                     log(f"[dim]  {line}[/dim]")
-            if not ok:
-                _fail("✗ terraform plan failed!", output)
-                return
-            log("[green]  ✓ Plan successful[/green]\n")
-
-            log("[bold]Running terraform apply...[/bold]")
-            log("[dim]  Polling Proxmox for real-time task progress...[/dim]")
 
-            # Start Proxmox progress monitor to track clone/create tasks
-            progress_monitor = None
-            try:
-                from infraforge.proxmox_progress import ProxmoxProgressMonitor
-                proxmox_client = self.app.proxmox
-                progress_monitor = ProxmoxProgressMonitor(
-                    proxmox_client,
-                    self.spec.node,
-                    log_fn=log,
-                    poll_interval=2.0,
-                )
-                progress_monitor.start()
-            except Exception:
-                pass  # Monitor is optional — deployment works without it
+            def _on_phase(phase: str):
+                nonlocal progress_monitor
+                if phase == "plan":
+                    _log_tail("init")
+                    log("[green]  ✓ Init successful[/green]\n")
+                elif phase == "apply":
+                    _log_tail("plan")
+                    log("[green]  ✓ Plan successful[/green]\n")
+                phase_output.clear()
+                log(f"[bold]Running terraform {phase}...[/bold]")
+                if phase != "apply":
+                    return
+                log("[dim]  Polling Proxmox for real-time task progress...[/dim]")
+
+                # Start Proxmox progress monitor to track clone/create tasks
+                try:
+                    from infraforge.proxmox_progress import ProxmoxProgressMonitor
+                    proxmox_client = self.app.proxmox
+                    progress_monitor = ProxmoxProgressMonitor(
+                        proxmox_client,
+                        self.spec.node,
+                        log_fn=log,
+                        poll_interval=2.0,
+                    )
+                    progress_monitor.start()
+                except Exception:
+                    pass  # Monitor is optional — deployment works without it
 
-            def _on_apply_line(line: str):
+            def _on_line(phase: str, line: str):
+                if phase != "apply":
+                    phase_output.append(line)
+                    return
                 stripped = line.strip()
                 if stripped:
                     # Escape Rich markup in terraform output
                     safe = stripped.replace("[", "\\[")
                     log(f"[dim]  {safe}[/dim]")
 
-            ok, output = tf.terraform_apply_streaming(
-                deploy_dir, line_callback=_on_apply_line,
+            ok, phase, output = tf.terraform_deploy_streaming(
+                deploy_dir, line_callback=_on_line, phase_callback=_on_phase,
             )
 
             # Stop the progress monitor
@@ -1668,7 +1670,9 @@ class NewVMScreen(Screen):
                     pass
 
             if not ok:
-                _fail("✗ terraform apply failed!", output)
+                if phase != "apply":
+                    _log_tail(phase)
+                _fail(f"✗ terraform {phase} failed!", output)
                 return
             if self._vm_count > 1:
                 log(f"\n[bold green]  ✓ {len(resolved_specs)} VMs created successfully![/bold green]\n")
@@ -1686,8 +1690,7 @@ class NewVMScreen(Screen):
                     # DNS
                     if dns_cfg.provider and dns_cfg.server and rs.dns_name and rs.ip_address:
                         try:
-                            from infraforge.dns_client import DNSClient
-                            dns = DNSClient.from_config(self.app.config)
+                            dns = self.app.dns_client
                             zone = rs.dns_zone or dns_cfg.domain
                             result = dns.ensure_record(rs.dns_name, "A", rs.ip_address, 3600, zone)
                             fqdn = f"{rs.dns_name}.{zone}"
@@ -1697,8 +1700,7 @@ class NewVMScreen(Screen):
                     # IPAM
                     if ipam_cfg.url and rs.ip_address and rs.subnet_id:
                         try:
-                            from infraforge.ipam_client import IPAMClient
-                            ipam = IPAMClient(self.app.config)
+                            ipam = self.app.ipam_client
                             ipam.create_address(rs.ip_address, rs.subnet_id, hostname=rs.name, description="Created by InfraForge")
                             log(f"[green]  \u2713 IPAM: {rs.ip_address} reserved[/green]")
                         except Exception as e:
@@ -1711,8 +1713,7 @@ class NewVMScreen(Screen):
                 ):
                     log("[bold]Creating DNS record...[/bold]")
                     try:
-                        from infraforge.dns_client import DNSClient
-                        dns = DNSClient.from_config(self.app.config)
+                        dns = self.app.dns_client
                         zone = self.spec.dns_zone or dns_cfg.domain
                         result = dns.ensure_record(
                             self.spec.dns_name, "A",
@@ -1730,8 +1731,7 @@ class NewVMScreen(Screen):
                 if ipam_cfg.url and self.spec.ip_address and self.spec.subnet_id:
                     log("[bold]Reserving IP in IPAM...[/bold]")
                     try:
-                        from infraforge.ipam_client import IPAMClient
-                        ipam = IPAMClient(self.app.config)
+                        ipam = self.app.ipam_client
                         ipam.create_address(
                             self.spec.ip_address, self.spec.subnet_id,
                             hostname=self.spec.name,
@@ -1762,6 +1762,7 @@ class NewVMScreen(Screen):
                 self._available_playbooks = discover_playbooks(playbook_dir)
             except Exception:
                 self._available_playbooks = []
+            self._build_post_deploy_playbook_items()
 
             if self._available_playbooks:
                 self.app.call_from_thread(self._show_post_deploy_options)
@@ -1861,6 +1862,20 @@ class NewVMScreen(Screen):
         items.append(WizItem(kind="info", label=""))
 
         items.append(WizItem(kind="header", label="AVAILABLE PLAYBOOKS"))
+        items.extend(self._post_deploy_playbook_items())
+
+        items.append(WizItem(kind="info", label=""))
+        items.append(WizItem(kind="header", label="SKIP"))
+        items.append(WizItem(
+            kind="option",
+            label="Skip  [dim]Don't run any playbook[/dim]",
+            key="__skip__",
+            group="post_deploy_playbook",
+        ))
+
+    def _build_post_deploy_playbook_items(self) -> None:
+        """Build the playbook option lines once the playbooks are discovered."""
+        cache = []
         for pb in self._available_playbooks:
             desc = pb.description if pb.description != pb.name else ""
             task_info = f"{pb.task_count} tasks"
@@ -1868,21 +1883,19 @@ class NewVMScreen(Screen):
                 lbl = f"{pb.filename}  [dim]{desc}  ({task_info})[/dim]"
             else:
                 lbl = f"{pb.filename}  [dim]({task_info})[/dim]"
-            items.append(WizItem(
+            cache.append(WizItem(
                 kind="option",
                 label=lbl,
                 key=str(pb.path),
                 group="post_deploy_playbook",
             ))
+        self._post_deploy_items_cache = cache
 
-        items.append(WizItem(kind="info", label=""))
-        items.append(WizItem(kind="header", label="SKIP"))
-        items.append(WizItem(
-            kind="option",
-            label="Skip  [dim]Don't run any playbook[/dim]",
-            key="__skip__",
-            group="post_deploy_playbook",
-        ))
+    def _post_deploy_playbook_items(self) -> list[WizItem]:
+        """Return the playbook option lines built when playbooks were loaded."""
+        for item in self._post_deploy_items_cache:
+            item.selected = False
+        return self._post_deploy_items_cache
 
     @work(thread=True)
     def _run_selected_playbook(self, playbook_path_str: str):
@@ -2,6 +2,31 @@
 
 from __future__ import annotations
 
+import base64
+import datetime
+import functools
+import hashlib
+import http.client
+import json
+import os
+import platform
+import re
+import secrets
+import shutil
+import socket
+import ssl as ssl_mod
+import subprocess
+import threading
+import time
+import urllib.request
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import MappingProxyType
+
+import bcrypt
+from rich.markup import escape
+from rich.text import Text
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Horizontal, Vertical, VerticalScroll
@@ -9,18 +34,87 @@ from textual import work
 from textual.screen import ModalScreen
 from textual.widgets import Button, Input, Label, Select, Static, Switch
 
+from infraforge.config import Config, IPAMConfig, _resolve_path
+
+
+def _gen_pass(n: int = 20) -> str:
+    """Return a random phpIPAM admin password (a-z and 2-7)."""
+    # One urandom read; base32 takes 5 bits per character, so unlike
+    # picking from a 36-char set it needs no per-character choice().
+    raw = secrets.token_bytes((n * 5 + 7) // 8)
+    return base64.b32encode(raw).decode()[:n].lower()
+
+
+def _parse_int(raw: str, default: int, minimum: int = 0) -> int | None:
+    """Parse an integer field: *default* if empty, None if invalid or below *minimum*."""
+    raw = raw.strip()
+    if not raw:
+        return default
+    if not (raw.isascii() and raw.isdigit()):
+        return None
+    value = int(raw)
+    return value if value >= minimum else None
+
+
+def _parse_port(raw: str, default: int) -> int | None:
+    """Parse a TCP port field: *default* if empty, None if invalid/out of range."""
+    port = _parse_int(raw, default, minimum=1)
+    return port if port is not None and port < 65536 else None
+
+
+def _gen_db_passes() -> tuple[str, str]:
+    """Return (db_pass, db_root_pass), 22 url-safe chars each, from one draw."""
+    blob = secrets.token_urlsafe(33)
+    return blob[:22], blob[22:]
+
 
 # ── Arrow-key navigation mixin for config modals ──────────────────
 
-_FOCUSABLE = (Input, Select, Switch)
+# Input/Select/Switch fields plus the Save button, in DOM order
+_FOCUSABLE_SELECTOR = "Input, Select, Switch, #save-btn"
 
 
 class _ArrowNavModal(ModalScreen):
-    """Base modal that adds up/down arrow navigation between fields
-    and auto-focuses the first input on mount."""
+    """Base for the config modals: holds the config section, the shared
+    Save/Cancel bindings, up/down arrow navigation between fields, and
+    focuses the first input on mount."""
+
+    CSS_PATH = "../../styles/setup_modals.tcss"
+
+    BINDINGS = [
+        Binding("ctrl+s", "save", "Save", show=False),
+        Binding("escape", "cancel", "Cancel", show=True),
+    ]
 
     _help_cmds: list[str] = []
 
+    def __init__(self, section: Mapping) -> None:
+        super().__init__()
+        # This component's config section; read-only, see get_config_modal
+        self._sec = section
+        # Visible fields in navigation order; reset whenever a
+        # _toggle_*_fields method changes which widgets are displayed.
+        self._focusable_cache: list | None = None
+        # Position of each cached field, so a step is a dict lookup
+        self._focus_index: dict = {}
+        # Every candidate field, visible or not; the DOM is fixed after
+        # compose, so this is queried once and then only filtered.
+        self._all_fields: list | None = None
+        # Ids of widgets/containers currently hidden by a toggle, and the
+        # id chain (widget + ancestors) of each field; the DOM shape is
+        # fixed after compose so the chains never go stale.
+        self._hidden_containers: set[str] = set()
+        self._ancestor_ids: dict = {}
+        # Kept in sync by watching each Select's ``expanded`` var, so
+        # arrow keys don't need to query the DOM for open dropdowns.
+        self._select_widgets: list[Select] = []
+        self._any_select_expanded = False
+
+    def _reject(self, field: Input, msg: str) -> None:
+        """Refuse a save because of *field*: say why and focus it."""
+        self.notify(msg, severity="error")
+        field.focus()
+
     def action_copy_cmd(self, idx: int) -> None:
         """Copy a help-panel command to the system clipboard."""
         if 0 <= idx < len(self._help_cmds):
@@ -28,33 +122,64 @@ class _ArrowNavModal(ModalScreen):
             self.notify("Copied to clipboard")
 
     def on_mount(self) -> None:
-        # Disable focus on scroll containers so they don't steal arrow keys
-        for vs in self.query(VerticalScroll):
-            vs.can_focus = False
+        # One walk for the scroll containers and the fields
+        self._all_fields = []
+        for w in self.query(f"VerticalScroll, {_FOCUSABLE_SELECTOR}"):
+            if isinstance(w, VerticalScroll):
+                # Don't let scroll containers steal arrow keys
+                w.can_focus = False
+            else:
+                self._all_fields.append(w)
+        self._select_widgets = [w for w in self._all_fields if isinstance(w, Select)]
+        for sel in self._select_widgets:
+            self.watch(sel, "expanded", self._on_select_expanded, init=False)
         fields = self._get_focusable_fields()
         if fields:
             fields[0].focus()
 
-    @staticmethod
-    def _is_displayed(widget) -> bool:
-        """Check widget and all ancestors have display=True."""
-        node = widget
-        while node is not None:
-            if not node.display:
-                return False
-            node = node.parent
-        return True
+    def _on_select_expanded(self) -> None:
+        self._any_select_expanded = any(s.expanded for s in self._select_widgets)
+
+    def _is_displayed(self, widget) -> bool:
+        """Check neither the widget nor any ancestor is a hidden container."""
+        if not self._hidden_containers:
+            return True
+        ids = self._ancestor_ids.get(widget)
+        if ids is None:
+            ids = self._ancestor_ids[widget] = tuple(
+                node.id for node in widget.ancestors_with_self if node.id
+            )
+        return self._hidden_containers.isdisjoint(ids)
+
+    def _set_hidden(self, *ids: str) -> None:
+        """Record which containers are hidden and drop the field cache."""
+        self._hidden_containers = set(ids)
+        self._focusable_cache = None
 
     def _get_focusable_fields(self) -> list:
         """Return visible, focusable fields in DOM order."""
-        all_widgets = list(self.query("*"))
-        return [
-            w for w in all_widgets
-            if self._is_displayed(w) and (
-                isinstance(w, _FOCUSABLE)
-                or (isinstance(w, Button) and (w.id or "").startswith("save-"))
-            )
-        ]
+        if self._focusable_cache is None:
+            if self._all_fields is None:
+                self._all_fields = list(self.query(_FOCUSABLE_SELECTOR))
+            self._focusable_cache = [
+                w for w in self._all_fields if self._is_displayed(w)
+            ]
+            self._focus_index = {w: i for i, w in enumerate(self._focusable_cache)}
+        return self._focusable_cache
+
+    def _next_focusable(self, current, direction: int):
+        """Return the visible field *direction* steps from *current*.
+
+        Wraps around; falls back to the first field when *current* isn't
+        one of the visible fields. None if there are no fields.
+        """
+        fields = self._get_focusable_fields()
+        if not fields:
+            return None
+        idx = self._focus_index.get(current)
+        if idx is None:
+            return fields[0]
+        return fields[(idx + direction) % len(fields)]
 
     def on_key(self, event) -> None:
         # Enter on Input/Switch advances to next field
@@ -69,9 +194,8 @@ class _ArrowNavModal(ModalScreen):
         if event.key not in ("down", "up"):
             return
         # Don't intercept arrows when any Select dropdown is expanded
-        for sel in self.query(Select):
-            if sel.expanded:
-                return
+        if self._any_select_expanded:
+            return
         event.prevent_default()
         event.stop()
         if event.key == "down":
@@ -80,142 +204,53 @@ class _ArrowNavModal(ModalScreen):
             self._move_field(-1)
 
     def _move_field(self, direction: int) -> None:
-        fields = self._get_focusable_fields()
-        if not fields:
-            return
-        current = self.app.focused
-        if current in fields:
-            idx = fields.index(current)
-            new_idx = (idx + direction) % len(fields)
-            fields[new_idx].focus()
-        else:
-            fields[0].focus()
+        target = self._next_focusable(self.app.focused, direction)
+        if target is not None:
+            target.focus()
+
+    def action_cancel(self) -> None:
+        self.dismiss(None)
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
-        btn_id = event.button.id or ""
-        if btn_id.startswith("reveal-"):
-            input_id = btn_id[len("reveal-"):]
-            try:
-                inp = self.query_one(f"#{input_id}", Input)
+        inp = getattr(event.button, "_paired_input", None)
+        if inp is not None:
+            if event.button.has_class("reveal-btn"):
                 inp.password = not inp.password
                 event.button.label = "Hide" if not inp.password else "Reveal"
-            except Exception:
-                pass
-        elif btn_id.startswith("copy-"):
-            input_id = btn_id[len("copy-"):]
-            try:
-                inp = self.query_one(f"#{input_id}", Input)
-                value = inp.value
-                if value:
-                    self.app.copy_to_clipboard(value)
-                    self.notify("Copied to clipboard")
-                else:
-                    self.notify("Field is empty", severity="warning")
-            except Exception:
-                pass
-        elif btn_id == "save-btn":
+            elif inp.value:
+                self.app.copy_to_clipboard(inp.value)
+                self.notify("Copied to clipboard")
+            else:
+                self.notify("Field is empty", severity="warning")
+            return
+        btn_id = event.button.id
+        if btn_id == "save-btn":
             self.action_save()
         elif btn_id == "cancel-btn":
             self.action_cancel()
 
 
-# ── Shared CSS for all config modals ───────────────────────────────
+def _secret_buttons(inp: Input):
+    """Yield the Reveal/Copy buttons for a password Input.
 
-_BOX_CSS = """
-#config-outer {
-    width: 95%;
-    max-height: 90%;
-    border: round $accent;
-    background: $surface;
-}
-#config-form {
-    width: 3fr;
-    padding: 1 2;
-}
-#config-help {
-    width: 2fr;
-    border-left: tall $accent;
-    padding: 1 2;
-    background: $primary-background;
-    content-align: left top;
-}
-#config-title {
-    text-style: bold;
-    color: $accent;
-    margin: 0 0 1 0;
-}
-#help-content {
-    width: 100%;
-    text-align: left;
-    color: $text;
-    padding: 0 0 1 0;
-    link-color: cyan;
-    link-style: italic;
-    link-color-hover: $accent;
-    link-background-hover: $primary-background;
-    link-style-hover: bold;
-}
-.field-label {
-    margin: 1 0 0 0;
-    color: $text;
-}
-.field-hint {
-    color: $text-muted;
-    text-style: italic;
-}
-.modal-buttons {
-    height: auto;
-    margin: 1 0 0 0;
-}
-.modal-buttons Button {
-    margin: 0 1 0 0;
-}
-.secret-row {
-    height: auto;
-}
-.secret-row Input {
-    width: 1fr;
-}
-.reveal-btn {
-    width: 12;
-    min-width: 12;
-    margin: 0 0 0 1;
-}
-.copy-btn {
-    width: 10;
-    min-width: 10;
-    margin: 0 0 0 0;
-}
-Input:focus {
-    border: tall $accent;
-}
-Select:focus {
-    border: tall $accent;
-}
-Switch:focus {
-    border: tall $accent;
-}
-#save-btn:focus {
-    background: $success;
-    color: $text;
-    text-style: bold;
-}
-"""
-
-_MODAL_ALIGN = """
-    align: left middle;
-    padding: 0 0 0 2;
-"""
+    Each button keeps a reference to its Input so the click handler
+    doesn't have to look it up by id.
+    """
+    for label, kind in (("Reveal", "reveal"), ("Copy", "copy")):
+        btn = Button(label, id=f"{kind}-{inp.id}", classes=f"{kind}-btn")
+        btn._paired_input = inp
+        yield btn
 
 
 # ── Help content for each module ──────────────────────────────────
+# Parsed to Text once at import so opening a modal skips markup parsing.
 
 _PROXMOX_CMDS = [
     "root@pam",
     "admin@pve",
 ]
 
-_PROXMOX_HELP = (
+_PROXMOX_HELP = Text.from_markup(
     "[bold cyan]PROXMOX SETUP[/bold cyan]\n"
     "[dim]───────────────────────────────────────[/dim]\n\n"
     "[bold cyan]CREATE API TOKEN[/bold cyan]\n\n"
@@ -262,7 +297,7 @@ _DNS_CMDS = [
     """grep -oP 'zone "\\K[^"]+' /etc/bind/named.conf.local""",
 ]
 
-_DNS_HELP = (
+_DNS_HELP = Text.from_markup(
     "[bold cyan]BIND9 DNS SETUP[/bold cyan]\n"
     "[dim]───────────────────────────────────────[/dim]\n"
     "[dim]Run these commands on your DNS server.[/dim]\n\n"
@@ -302,10 +337,12 @@ _DNS_HELP = (
     "    [reverse] $ grep -oP 'zone \"\\K\\[^\"]+'              [/reverse]\n"
     "    [reverse]   /etc/bind/named.conf.local               [/reverse]"
     "[@click=screen.copy_cmd(6)][dim italic] copy[/dim italic][/]\n\n"
+    "  [dim]Zones can be separated by commas or whitespace,[/dim]\n"
+    "  [dim]so this output can be pasted in as-is.[/dim]\n\n"
     "  [dim]InfraForge auto-discovers zones on first connect.[/dim]"
 )
 
-_IPAM_HELP = (
+_IPAM_HELP = Text.from_markup(
     "[bold cyan]IPAM SETUP[/bold cyan]\n"
     "[dim]───────────────────────────────────────[/dim]\n\n"
     "[bold cyan]DOCKER DEPLOYMENT[/bold cyan]\n\n"
@@ -339,7 +376,7 @@ _IPAM_HELP = (
     "  Docker deployments, and internal servers."
 )
 
-_TERRAFORM_HELP = (
+_TERRAFORM_HELP = Text.from_markup(
     "[bold cyan]TERRAFORM SETUP[/bold cyan]\n"
     "[dim]───────────────────────────────────────[/dim]\n\n"
     "[bold cyan]HOW IT WORKS[/bold cyan]\n\n"
@@ -377,10 +414,9 @@ _TERRAFORM_HELP = (
 )
 
 def _get_ansible_cmds():
-    from infraforge.config import _resolve_path
     return [_resolve_path("", "./ansible/playbooks")]
 
-_ANSIBLE_HELP = (
+_ANSIBLE_HELP = Text.from_markup(
     "[bold cyan]ANSIBLE SETUP[/bold cyan]\n"
     "[dim]───────────────────────────────────────[/dim]\n\n"
     "[bold cyan]PLAYBOOK DIRECTORY[/bold cyan]\n\n"
@@ -409,7 +445,7 @@ _ANSIBLE_HELP = (
     "  setup screen if missing.[/dim]"
 )
 
-_AI_HELP = (
+_AI_HELP = Text.from_markup(
     "[bold cyan]AI COPILOT SETUP[/bold cyan]\n"
     "[dim]───────────────────────────────────────[/dim]\n\n"
     "[bold cyan]GET AN API KEY[/bold cyan]\n\n"
@@ -441,7 +477,7 @@ _AI_HELP = (
     "    AI chat panel."
 )
 
-_CLOUDFLARE_HELP = (
+_CLOUDFLARE_HELP = Text.from_markup(
     "[bold cyan]CLOUDFLARE DNS SETUP[/bold cyan]\n"
     "[dim]───────────────────────────────────────[/dim]\n\n"
     "[bold cyan]GET AN API TOKEN[/bold cyan]\n\n"
@@ -472,25 +508,21 @@ _CLOUDFLARE_HELP = (
 )
 
 
-# ── Helper ────────────────────────────────────────────────────────
+# ── Select options (shared, never mutated) ─────────────────────────
 
-def get_config_modal(comp_id: str, full_cfg: dict) -> ModalScreen | None:
-    """Return the appropriate config modal for a component."""
-    section = dict(full_cfg.get(comp_id, {}))  # shallow copy
-    modals = {
-        "proxmox": ProxmoxConfigModal,
-        "dns": DNSConfigModal,
-        "ipam": IPAMConfigModal,
-        "terraform": TerraformConfigModal,
-        "ansible": AnsibleConfigModal,
-        "ai": AIConfigModal,
-        "cloudflare": CloudflareConfigModal,
-        "defaults": DefaultsConfigModal,
-    }
-    cls = modals.get(comp_id)
-    if cls is None:
-        return None
-    return cls(section)
+_AUTH_METHOD_OPTIONS = (("API Token (recommended)", "token"), ("Password", "password"))
+_DNS_PROVIDER_OPTIONS = (("BIND9", "bind9"), ("Cloudflare", "cloudflare"), ("Route53", "route53"), ("Custom", "custom"))
+_TSIG_ALGO_OPTIONS = (("hmac-sha256", "hmac-sha256"), ("hmac-sha512", "hmac-sha512"), ("hmac-md5", "hmac-md5"))
+_IPAM_METHOD_OPTIONS = (
+    ("Deploy phpIPAM with Docker (recommended)", "docker"),
+    ("Connect to existing phpIPAM server", "existing"),
+)
+_STATE_BACKEND_OPTIONS = (("Local", "local"), ("S3", "s3"), ("Consul", "consul"))
+_AI_MODEL_OPTIONS = (
+    ("Claude Opus 4.6", "claude-opus-4-6"),
+    ("Claude Sonnet 4.5", "claude-sonnet-4-5-20250929"),
+    ("Claude Haiku 4.5", "claude-haiku-4-5-20251001"),
+)
 
 
 # ── Proxmox Config Modal ──────────────────────────────────────────
@@ -499,20 +531,10 @@ class ProxmoxConfigModal(_ArrowNavModal):
 
     _help_cmds = _PROXMOX_CMDS
 
-    BINDINGS = [
-        Binding("ctrl+s", "save", "Save", show=False),
-        Binding("escape", "cancel", "Cancel", show=True),
-    ]
-
-    DEFAULT_CSS = f"""
-ProxmoxConfigModal {{
-{_MODAL_ALIGN}
-}}
-""" + _BOX_CSS
-
-    def __init__(self, section: dict) -> None:
-        super().__init__()
-        self._sec = section
+    def __init__(self, section: Mapping) -> None:
+        super().__init__(section)
+        # Auth mode the fields were last laid out for
+        self._last_auth_is_token: bool | None = None
 
     def compose(self) -> ComposeResult:
         s = self._sec
@@ -521,45 +543,54 @@ ProxmoxConfigModal {{
                 yield Static("[bold]Proxmox Configuration[/bold]", id="config-title", markup=True)
 
                 yield Label("Host [dim](IP or hostname)[/dim]", classes="field-label", markup=True)
-                yield Input(value=s.get("host", ""), placeholder="e.g. 10.0.200.1", id="f-host")
+                self._f_host = Input(value=s.get("host", ""), placeholder="e.g. 10.0.200.1", id="f-host")
+                yield self._f_host
 
                 yield Label("Port", classes="field-label")
-                yield Input(value=str(s.get("port", 8006)), placeholder="8006", id="f-port")
+                self._f_port = Input(value=str(s.get("port", 8006)), placeholder="8006", id="f-port")
+                yield self._f_port
 
                 yield Label("User", classes="field-label")
-                yield Input(value=s.get("user", "root@pam"), placeholder="root@pam", id="f-user")
+                self._f_user = Input(value=s.get("user", "root@pam"), placeholder="root@pam", id="f-user")
+                yield self._f_user
 
                 yield Label("Auth Method", classes="field-label")
-                yield Select(
-                    [("API Token (recommended)", "token"), ("Password", "password")],
+                self._f_auth_method = Select(
+                    _AUTH_METHOD_OPTIONS,
                     value=s.get("auth_method", "token"),
                     id="f-auth-method",
                 )
-
-                yield Label("Token Name", classes="field-label", id="lbl-token-name")
-                yield Input(value=s.get("token_name", ""), placeholder="e.g. infraforge", id="f-token-name")
-
-                yield Label("Token Value", classes="field-label", id="lbl-token-value")
-                with Horizontal(classes="secret-row", id="row-token-value"):
-                    yield Input(value=s.get("token_value", ""), placeholder="xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx", id="f-token-value", password=True)
-                    yield Button("Reveal", id="reveal-f-token-value", classes="reveal-btn")
-                    yield Button("Copy", id="copy-f-token-value", classes="copy-btn")
-
-                yield Label("Password", classes="field-label", id="lbl-password")
-                with Horizontal(classes="secret-row", id="row-password"):
-                    yield Input(value=s.get("password", ""), placeholder="", id="f-password", password=True)
-                    yield Button("Reveal", id="reveal-f-password", classes="reveal-btn")
-                    yield Button("Copy", id="copy-f-password", classes="copy-btn")
+                yield self._f_auth_method
+
+                self._lbl_token_name = Label("Token Name", classes="field-label", id="lbl-token-name")
+                yield self._lbl_token_name
+                self._f_token_name = Input(value=s.get("token_name", ""), placeholder="e.g. infraforge", id="f-token-name")
+                yield self._f_token_name
+
+                self._lbl_token_value = Label("Token Value", classes="field-label", id="lbl-token-value")
+                yield self._lbl_token_value
+                with Horizontal(classes="secret-row", id="row-token-value") as self._row_token_value:
+                    self._f_token_value = Input(value=s.get("token_value", ""), placeholder="xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx", id="f-token-value", password=True)
+                    yield self._f_token_value
+                    yield from _secret_buttons(self._f_token_value)
+
+                self._lbl_password = Label("Password", classes="field-label", id="lbl-password")
+                yield self._lbl_password
+                with Horizontal(classes="secret-row", id="row-password") as self._row_password:
+                    self._f_password = Input(value=s.get("password", ""), placeholder="", id="f-password", password=True)
+                    yield self._f_password
+                    yield from _secret_buttons(self._f_password)
 
                 yield Label("Verify SSL", classes="field-label")
-                yield Switch(value=s.get("verify_ssl", False), id="f-verify-ssl")
+                self._f_verify_ssl = Switch(value=s.get("verify_ssl", False), id="f-verify-ssl")
+                yield self._f_verify_ssl
 
                 with Horizontal(classes="modal-buttons"):
                     yield Button("Save", id="save-btn", variant="success")
                     yield Button("Cancel", id="cancel-btn")
 
             with VerticalScroll(id="config-help"):
-                yield Static(_PROXMOX_HELP, id="help-content", markup=True)
+                yield Static(_PROXMOX_HELP, id="help-content", markup=False)
 
     def on_mount(self) -> None:
         super().on_mount()
@@ -570,36 +601,52 @@ ProxmoxConfigModal {{
             self._toggle_auth_fields()
 
     def _toggle_auth_fields(self) -> None:
-        auth = self.query_one("#f-auth-method", Select).value
-        is_token = auth == "token"
-        # Token fields
-        self.query_one("#f-token-name", Input).display = is_token
-        self.query_one("#lbl-token-name").display = is_token
-        self.query_one("#row-token-value").display = is_token
-        self.query_one("#lbl-token-value").display = is_token
-        # Password field
-        self.query_one("#row-password").display = not is_token
-        self.query_one("#lbl-password").display = not is_token
+        is_token = self._f_auth_method.value == "token"
+        if is_token == self._last_auth_is_token:
+            return
+        self._last_auth_is_token = is_token
+        # One layout pass for the whole swap
+        with self.app.batch_update():
+            # Token fields
+            self._f_token_name.display = is_token
+            self._lbl_token_name.display = is_token
+            self._row_token_value.display = is_token
+            self._lbl_token_value.display = is_token
+            # Password field
+            self._row_password.display = not is_token
+            self._lbl_password.display = not is_token
+        if is_token:
+            self._set_hidden("row-password", "lbl-password")
+        else:
+            self._set_hidden(
+                "f-token-name", "lbl-token-name",
+                "row-token-value", "lbl-token-value",
+            )
 
     def action_save(self) -> None:
-        host = self.query_one("#f-host", Input).value.strip()
+        host = self._f_host.value.strip()
         if not host:
             self.notify("Host is required!", severity="error")
             return
+        port = _parse_port(self._f_port.value, 8006)
+        if port is None:
+            self._reject(self._f_port, "Port must be a number from 1 to 65535")
+            return
         result = {
             "host": host,
-            "port": int(self.query_one("#f-port", Input).value.strip() or 8006),
-            "user": self.query_one("#f-user", Input).value.strip() or "root@pam",
-            "auth_method": self.query_one("#f-auth-method", Select).value,
-            "token_name": self.query_one("#f-token-name", Input).value.strip(),
-            "token_value": self.query_one("#f-token-value", Input).value.strip(),
-            "password": self.query_one("#f-password", Input).value.strip(),
-            "verify_ssl": self.query_one("#f-verify-ssl", Switch).value,
+            "port": port,
+            "user": self._f_user.value.strip() or "root@pam",
+            "auth_method": self._f_auth_method.value,
+            "token_name": self._f_token_name.value.strip(),
+            "token_value": self._f_token_value.value.strip(),
+            "password": self._f_password.value.strip(),
+            "verify_ssl": self._f_verify_ssl.value,
         }
         self.dismiss(result)
 
-    def action_cancel(self) -> None:
-        self.dismiss(None)
+
+# Separators in the DNS zones field: commas and/or whitespace
+_ZONE_SPLIT_RE = re.compile(r"[,\s]+")
 
 
 # ── DNS Config Modal ───────────────────────────────────────────────
@@ -608,152 +655,566 @@ class DNSConfigModal(_ArrowNavModal):
 
     _help_cmds = _DNS_CMDS
 
-    BINDINGS = [
-        Binding("ctrl+s", "save", "Save", show=False),
-        Binding("escape", "cancel", "Cancel", show=True),
-    ]
-
-    DEFAULT_CSS = f"""
-DNSConfigModal {{
-{_MODAL_ALIGN}
-}}
-""" + _BOX_CSS
-
-    def __init__(self, section: dict) -> None:
-        super().__init__()
-        self._sec = section
-
     def compose(self) -> ComposeResult:
         s = self._sec
         zones = s.get("zones", [])
         if not zones and s.get("zone"):
             zones = [s["zone"]]
         zones_str = ", ".join(zones) if zones else ""
+        # Reused on save when the field is left untouched
+        self._zones_initial = (zones_str, list(zones))
 
         with Horizontal(id="config-outer"):
             with VerticalScroll(id="config-form"):
                 yield Static("[bold]DNS Configuration[/bold]", id="config-title", markup=True)
 
                 yield Label("Provider", classes="field-label")
-                yield Select(
-                    [("BIND9", "bind9"), ("Cloudflare", "cloudflare"), ("Route53", "route53"), ("Custom", "custom")],
+                self._f_provider = Select(
+                    _DNS_PROVIDER_OPTIONS,
                     value=s.get("provider", "bind9"),
                     id="f-provider",
                 )
+                yield self._f_provider
 
                 yield Label("Server [dim](BIND9 IP/hostname)[/dim]", classes="field-label", markup=True)
-                yield Input(value=s.get("server", ""), placeholder="e.g. 10.0.200.2", id="f-server")
+                self._f_server = Input(value=s.get("server", ""), placeholder="e.g. 10.0.200.2", id="f-server")
+                yield self._f_server
 
                 yield Label("Port", classes="field-label")
-                yield Input(value=str(s.get("port", 53)), placeholder="53", id="f-port")
+                self._f_port = Input(value=str(s.get("port", 53)), placeholder="53", id="f-port")
+                yield self._f_port
 
                 yield Label("Domain [dim](default FQDN domain)[/dim]", classes="field-label", markup=True)
-                yield Input(value=s.get("domain", ""), placeholder="e.g. lab.local", id="f-domain")
+                self._f_domain = Input(value=s.get("domain", ""), placeholder="e.g. lab.local", id="f-domain")
+                yield self._f_domain
 
-                yield Label("Zones [dim](comma-separated)[/dim]", classes="field-label", markup=True)
-                yield Input(value=zones_str, placeholder="e.g. lab.local, dev.local", id="f-zones")
+                yield Label("Zones [dim](separated by commas or spaces)[/dim]", classes="field-label", markup=True)
+                self._f_zones = Input(value=zones_str, placeholder="e.g. lab.local, dev.local", id="f-zones")
+                yield self._f_zones
 
                 yield Label("TSIG Key Name", classes="field-label")
-                yield Input(value=s.get("tsig_key_name", ""), placeholder="e.g. infraforge-key", id="f-tsig-name")
+                self._f_tsig_name = Input(value=s.get("tsig_key_name", ""), placeholder="e.g. infraforge-key", id="f-tsig-name")
+                yield self._f_tsig_name
 
                 yield Label("TSIG Key Secret [dim](base64 from key file)[/dim]", classes="field-label", markup=True)
                 with Horizontal(classes="secret-row"):
-                    yield Input(value=s.get("tsig_key_secret", ""), placeholder="base64 secret", id="f-tsig-secret", password=True)
-                    yield Button("Reveal", id="reveal-f-tsig-secret", classes="reveal-btn")
-                    yield Button("Copy", id="copy-f-tsig-secret", classes="copy-btn")
+                    self._f_tsig_secret = Input(value=s.get("tsig_key_secret", ""), placeholder="base64 secret", id="f-tsig-secret", password=True)
+                    yield self._f_tsig_secret
+                    yield from _secret_buttons(self._f_tsig_secret)
 
                 yield Label("TSIG Algorithm", classes="field-label")
-                yield Select(
-                    [("hmac-sha256", "hmac-sha256"), ("hmac-sha512", "hmac-sha512"), ("hmac-md5", "hmac-md5")],
+                self._f_tsig_algo = Select(
+                    _TSIG_ALGO_OPTIONS,
                     value=s.get("tsig_algorithm", "hmac-sha256"),
                     id="f-tsig-algo",
                 )
+                yield self._f_tsig_algo
 
                 yield Label("API Key [dim](Cloudflare/Route53)[/dim]", classes="field-label", markup=True)
                 with Horizontal(classes="secret-row"):
-                    yield Input(value=s.get("api_key", ""), placeholder="API key", id="f-api-key", password=True)
-                    yield Button("Reveal", id="reveal-f-api-key", classes="reveal-btn")
-                    yield Button("Copy", id="copy-f-api-key", classes="copy-btn")
+                    self._f_api_key = Input(value=s.get("api_key", ""), placeholder="API key", id="f-api-key", password=True)
+                    yield self._f_api_key
+                    yield from _secret_buttons(self._f_api_key)
 
                 with Horizontal(classes="modal-buttons"):
                     yield Button("Save", id="save-btn", variant="success")
                     yield Button("Cancel", id="cancel-btn")
 
             with VerticalScroll(id="config-help"):
-                yield Static(_DNS_HELP, id="help-content", markup=True)
+                yield Static(_DNS_HELP, id="help-content", markup=False)
 
     def action_save(self) -> None:
-        zones_raw = self.query_one("#f-zones", Input).value.strip()
-        zones = [z.strip() for z in zones_raw.split(",") if z.strip()] if zones_raw else []
+        port = _parse_port(self._f_port.value, 53)
+        if port is None:
+            self._reject(self._f_port, "Port must be a number from 1 to 65535")
+            return
+        zones_raw = self._f_zones.value.strip()
+        if zones_raw == self._zones_initial[0]:
+            zones = self._zones_initial[1]
+        else:
+            zones = [z for z in _ZONE_SPLIT_RE.split(zones_raw) if z]
         result = {
-            "provider": self.query_one("#f-provider", Select).value,
-            "server": self.query_one("#f-server", Input).value.strip(),
-            "port": int(self.query_one("#f-port", Input).value.strip() or 53),
-            "domain": self.query_one("#f-domain", Input).value.strip(),
+            "provider": self._f_provider.value,
+            "server": self._f_server.value.strip(),
+            "port": port,
+            "domain": self._f_domain.value.strip(),
             "zones": zones,
-            "tsig_key_name": self.query_one("#f-tsig-name", Input).value.strip(),
-            "tsig_key_secret": self.query_one("#f-tsig-secret", Input).value.strip(),
-            "tsig_algorithm": self.query_one("#f-tsig-algo", Select).value,
-            "api_key": self.query_one("#f-api-key", Input).value.strip(),
+            "tsig_key_name": self._f_tsig_name.value.strip(),
+            "tsig_key_secret": self._f_tsig_secret.value.strip(),
+            "tsig_algorithm": self._f_tsig_algo.value,
+            "api_key": self._f_api_key.value.strip(),
         }
         self.dismiss(result)
 
-    def action_cancel(self) -> None:
-        self.dismiss(None)
+
+# Certificate checks off: the phpIPAM container uses a self-signed cert.
+# Built once and shared by every readiness probe.
+_INSECURE_CTX = ssl_mod.SSLContext(ssl_mod.PROTOCOL_TLS_CLIENT)
+_INSECURE_CTX.check_hostname = False
+_INSECURE_CTX.verify_mode = ssl_mod.CERT_NONE
+
+
+# ── Docker environment detection ───────────────────────────────────
+
+@functools.lru_cache(maxsize=1)
+def _sudo_prefix() -> tuple[str, ...]:
+    """``("sudo",)`` unless already running as root."""
+    return ("sudo",) if os.geteuid() != 0 else ()
+
+
+@functools.lru_cache(maxsize=1)
+def _has_apt() -> bool:
+    return shutil.which("apt-get") is not None
+
+
+@functools.lru_cache(maxsize=1)
+def _has_systemctl() -> bool:
+    return shutil.which("systemctl") is not None
+
+
+@functools.lru_cache(maxsize=1)
+def _probe_docker() -> tuple[bool, tuple[str, ...]]:
+    """Return ``(reachable, docker_prefix)`` from ``docker info``.
+
+    Tries the current user first, then sudo. When neither reaches the
+    daemon the prefix is the sudo one, as that's what an install needs.
+    """
+    sudo = _sudo_prefix()
+    if shutil.which("docker") is None:
+        return False, sudo
+    for prefix in ((), sudo) if sudo else ((),):
+        try:
+            r = subprocess.run([*prefix, "docker", "info"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
+        except (OSError, subprocess.SubprocessError):
+            continue
+        if r.returncode == 0:
+            return True, prefix
+    return False, sudo
+
+
+def _forget_docker_env() -> None:
+    """Drop the cached Docker probes, e.g. after installing Docker."""
+    _probe_docker.cache_clear()
+    _detect_docker_env.cache_clear()
+
+
+def _revalidate_docker_env() -> None:
+    """Forget a cached "reachable" probe if the daemon has since stopped.
+
+    Call at the start of each deploy/repair; a fresh process has nothing
+    cached, so this only costs one ``docker info`` on repeat runs.
+    """
+    if not _probe_docker.cache_info().currsize:
+        return
+    reachable, prefix = _probe_docker()
+    if not reachable:
+        return
+    try:
+        r = subprocess.run([*prefix, "docker", "info"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
+        ok = r.returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        ok = False
+    if not ok:
+        _forget_docker_env()
+
+
+@functools.lru_cache(maxsize=1)
+def _detect_docker_env() -> tuple[tuple[str, ...], tuple[str, ...] | None]:
+    """Return ``(docker_prefix, compose_cmd)`` for this host.
+
+    docker_prefix is ``("sudo",)`` when the current user can't reach the
+    daemon directly; compose_cmd is None if neither ``docker compose`` nor
+    ``docker-compose`` works. Probed once per process -- call
+    ``_forget_docker_env()`` after installing Docker/compose.
+    """
+    # `compose version` doesn't talk to the daemon, so both compose
+    # flavours are probed alongside docker info rather than after it;
+    # v2 is preferred over legacy docker-compose whenever both work.
+    candidates = (("docker", "compose"), ("docker-compose",))
+    with ThreadPoolExecutor(max_workers=len(candidates) + 1) as pool:
+        probe = pool.submit(_probe_docker)
+        futures = [pool.submit(_compose_works, c) for c in candidates]
+        compose = next((c for c, f in zip(candidates, futures) if f.result()), None)
+        docker_prefix = probe.result()[1]
+    # Both flavours talk to the daemon, so both need its sudo prefix
+    if compose is not None:
+        compose = docker_prefix + compose
+    return docker_prefix, compose
+
+
+def _compose_works(candidate: tuple[str, ...]) -> bool:
+    try:
+        return subprocess.run([*candidate, "version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5).returncode == 0
+    except Exception:
+        return False
+
+
+def _https_status(port: int, path: str, ctx: ssl_mod.SSLContext) -> int | None:
+    """HEAD ``https://localhost:<port><path>`` and return the status code.
+
+    A plain TCP connect is tried first so a closed port is detected
+    without paying for a TLS handshake. Returns None if unreachable.
+    """
+    try:
+        socket.create_connection(("localhost", port), timeout=0.5).close()
+    except OSError:
+        return None
+    conn = http.client.HTTPSConnection("localhost", port, timeout=3, context=ctx)
+    try:
+        conn.request("HEAD", path)
+        return conn.getresponse().status
+    except (OSError, http.client.HTTPException):
+        return None
+    finally:
+        conn.close()
+
+
+# Hashes by the password's SHA-256, so a retried deploy or repair in the
+# same session doesn't pay for bcrypt again without keeping plaintext
+# passwords around. Any valid hash of the password will do, so reusing
+# the salt is harmless.
+_HASH_CACHE: dict[str, str] = {}
+
+
+def _php_password_hash(password: str) -> str:
+    """Return a PHP ``password_hash()``-compatible bcrypt hash.
+
+    PHP's default is bcrypt with cost 10, written with a ``$2y$`` prefix;
+    like PHP, only the first 72 bytes of the password are used.
+    """
+    key = hashlib.sha256(password.encode()).hexdigest()
+    cached = _HASH_CACHE.get(key)
+    if cached:
+        return cached
+    hashed = bcrypt.hashpw(password.encode()[:72], bcrypt.gensalt(rounds=10)).decode()
+    hashed = "$2y$" + hashed[4:]
+    _HASH_CACHE[key] = hashed
+    return hashed
+
+
+def _hash_matches(password: str, hashed: str) -> bool:
+    """Check a password against a PHP bcrypt hash.
+
+    Returns False when the hash is empty or invalid.
+    """
+    if not hashed:
+        return False
+    try:
+        return bcrypt.checkpw(password.encode()[:72], ("$2b$" + hashed[4:]).encode())
+    except ValueError:
+        return False
+
+
+@functools.lru_cache(maxsize=4)
+def _read_env(path: str, mtime_ns: int) -> dict[str, str]:
+    env = {}
+    with open(path) as f:
+        for line in f:
+            key, sep, value = line.partition("=")
+            if sep and not key.lstrip().startswith("#"):
+                env[key.strip()] = value.strip()
+    return env
+
+
+def _parse_env(path: Path) -> dict[str, str]:
+    """Return the KEY=VALUE pairs of a compose ``.env`` file.
+
+    Cached until the file's mtime changes; treat the result as read-only.
+    A missing or unreadable file gives an empty dict.
+    """
+    try:
+        return _read_env(str(path), path.stat().st_mtime_ns)
+    except OSError:
+        return {}
+
+
+def _ensure_ssl_cert(phpipam_dir: Path) -> subprocess.Popen | None:
+    """Create phpIPAM's self-signed cert in *phpipam_dir*/ssl if missing.
+
+    Generated in-process with ``cryptography`` (an EC P-256 key, which
+    takes milliseconds). Without it, falls back to generate-ssl.sh and
+    returns the still-running process for the caller to wait on.
+    """
+    ssl_dir = phpipam_dir / "ssl"
+    cert_path = ssl_dir / "phpipam-cert.pem"
+    key_path = ssl_dir / "phpipam-key.pem"
+    if cert_path.exists() and key_path.exists():
+        return None
+    try:
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.x509.oid import NameOID
+    except ImportError:
+        script = phpipam_dir / "generate-ssl.sh"
+        if not script.exists():
+            return None
+        return subprocess.Popen(
+            ["bash", str(script)], cwd=str(phpipam_dir),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([
+        x509.NameAttribute(NameOID.COUNTRY_NAME, "US"),
+        x509.NameAttribute(NameOID.STATE_OR_PROVINCE_NAME, "Local"),
+        x509.NameAttribute(NameOID.LOCALITY_NAME, "Local"),
+        x509.NameAttribute(NameOID.ORGANIZATION_NAME, "InfraForge"),
+        x509.NameAttribute(NameOID.COMMON_NAME, "phpipam.local"),
+    ])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=3650))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName("phpipam.local"), x509.DNSName("localhost")]),
+            critical=False,
+        )
+        .sign(key, hashes.SHA256())
+    )
+    ssl_dir.mkdir(parents=True, exist_ok=True)
+    fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.TraditionalOpenSSL,
+            serialization.NoEncryption(),
+        ))
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    return None
+
+
+def _write_env(path: Path, lines: list[str]) -> None:
+    """Atomically replace the compose ``.env`` at *path* with *lines*.
+
+    Written to a sibling temp file and renamed into place, so compose
+    never sees a half-written file. Owner-only, as it holds passwords.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.fchmod(fd, 0o600)  # in case a stale .tmp had wider permissions
+    with os.fdopen(fd, "w") as f:
+        f.writelines(line + "\n" for line in lines)
+    os.replace(tmp, path)
+
+
+def _wait_healthy(
+    docker_prefix: list[str], container: str, timeout: float, track=None,
+) -> bool | None:
+    """Block until *container*'s healthcheck reports healthy.
+
+    Listens on ``docker events`` rather than polling. Returns True once
+    healthy, False if that doesn't happen within *timeout* seconds (or the
+    events process is killed), or None if the container has no
+    healthcheck to wait on. *track*, if given, is called with the events
+    process so the caller can kill it to abort the wait.
+    """
+    # Popen returning doesn't mean the daemon has subscribed yet; --since
+    # replays anything from before that, so no health transition between
+    # here and the inspect below can be missed.
+    since = f"{time.time():.3f}"
+    try:
+        events = subprocess.Popen(
+            docker_prefix + [
+                "docker", "events", "--since", since,
+                "--filter", f"container={container}",
+                "--filter", "event=health_status",
+                "--format", "{{.Status}}",
+            ],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        )
+    except OSError:
+        return None
+    if track is not None:
+        track(events)
+    timer = threading.Timer(timeout, events.kill)
+    timer.start()
+    try:
+        # Anything after *since* shows up in the events stream
+        r = subprocess.run(
+            docker_prefix + [
+                "docker", "inspect", "--format",
+                "{{if .State.Health}}{{.State.Health.Status}}{{end}}", container,
+            ],
+            capture_output=True, text=True, timeout=10,
+        )
+        health = r.stdout.strip()
+        if r.returncode != 0 or not health:
+            return None
+        if health == "healthy":
+            return True
+        for line in events.stdout:
+            if line.strip().endswith(": healthy"):
+                return True
+        return False
+    except (OSError, subprocess.SubprocessError):
+        return None
+    finally:
+        timer.cancel()
+        events.kill()
+        events.wait()
+
+
+def _wait_ready(
+    docker_prefix: list[str], port: int, timeout: float = 180,
+    track=None, stop: threading.Event | None = None,
+) -> bool:
+    """Wait until the phpIPAM web container serves its API on *port*.
+
+    Uses the container healthcheck when there is one, otherwise polls the
+    web root with HEAD requests and backoff. *track* is passed on to
+    _wait_healthy; setting *stop* ends the polling early.
+    """
+    if stop is None:
+        stop = threading.Event()
+    ready = _wait_healthy(docker_prefix, "infraforge-ipam-web", timeout, track=track)
+    if ready is None:
+        # No healthcheck on the container (older compose file): poll
+        ready = False
+        deadline = time.monotonic() + timeout
+        delay = 0.25
+        while time.monotonic() < deadline:
+            if _https_status(port, "/", _INSECURE_CTX) in (200, 301, 302):
+                ready = True
+                break
+            if stop.wait(delay):
+                break
+            delay = min(delay * 1.5, 3.0)
+
+    if ready:
+        # The web root can answer before PHP/the DB are up; wait for
+        # the API path to stop erroring rather than sleeping blindly.
+        deadline = time.monotonic() + 10
+        delay = 0.25
+        while time.monotonic() < deadline:
+            code = _https_status(port, "/api/", _INSECURE_CTX)
+            if code is not None and code < 500:
+                break
+            time.sleep(delay)
+            delay = min(delay * 1.5, 3.0)
+    return ready
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _compose_download(arch: str) -> Path:
+    """Return a local copy of the docker compose v2 binary for *arch*.
+
+    Kept in the user cache dir so a retried install doesn't download it
+    again. The release's SHA-256 is saved next to it, and the cached
+    copy is re-checked against it on every call, since it's about to be
+    installed as root; a copy that fails the check is downloaded again.
+    """
+    name = f"docker-compose-linux-{arch}"
+    cache_dir = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    cached = cache_dir / "infraforge" / name
+    sum_file = cached.with_name(name + ".sha256")
+    try:
+        if _sha256_file(cached) == sum_file.read_text().strip():
+            return cached
+    except OSError:
+        pass
+
+    url = f"https://github.com/docker/compose/releases/latest/download/{name}"
+    with urllib.request.urlopen(url + ".sha256", timeout=30) as resp:
+        expected = resp.read().split()[0].decode()
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cached.with_name(name + ".part")
+    digest = hashlib.sha256()
+    with urllib.request.urlopen(url, timeout=60) as resp, open(tmp, "wb") as f:
+        while chunk := resp.read(1 << 20):
+            digest.update(chunk)
+            f.write(chunk)
+    if digest.hexdigest() != expected:
+        tmp.unlink(missing_ok=True)
+        raise RuntimeError(f"{name} download failed its SHA-256 check")
+    os.replace(tmp, cached)
+    sum_file.write_text(expected + "\n")
+    return cached
+
+
+def _verify_admin_api(url: str, admin_pass: str, attempts: int = 5) -> bool:
+    """Check the local phpIPAM API accepts the Admin login.
+
+    One client (and so one HTTP session) is reused across the retries.
+    """
+    # Imported here so opening a modal doesn't pull in requests
+    from infraforge.ipam_client import IPAMClient
+
+    cfg = Config()
+    cfg.ipam = IPAMConfig(
+        provider="phpipam", url=url, app_id="infraforge",
+        token="", username="Admin", password=admin_pass,
+        verify_ssl=False,
+    )
+    client = IPAMClient(cfg)
+    for attempt in range(attempts):
+        if client.check_health():
+            return True
+        if attempt < attempts - 1:
+            time.sleep(3)
+    return False
+
+
+# Containers of the phpIPAM compose stack (docker/docker-compose.yml)
+_IPAM_CONTAINERS = ("infraforge-ipam-web", "infraforge-ipam-db", "infraforge-ipam-cron")
 
 
 # ── IPAM Config Modal ──────────────────────────────────────────────
 
 class IPAMConfigModal(_ArrowNavModal):
 
-    BINDINGS = [
-        Binding("ctrl+s", "save", "Save", show=False),
-        Binding("escape", "cancel", "Cancel", show=True),
-    ]
-
-    DEFAULT_CSS = f"""
-IPAMConfigModal {{
-{_MODAL_ALIGN}
-}}
-#ipam-docker-fields, #ipam-existing-fields {{
+    DEFAULT_CSS = """
+#ipam-docker-fields, #ipam-existing-fields {
     height: auto;
-}}
-#docker-status {{
+}
+#docker-status {
     height: auto;
     margin: 1 0 0 0;
-}}
-""" + _BOX_CSS
+}
+"""
 
-    def __init__(self, section: dict) -> None:
-        super().__init__()
-        self._sec = section
+    def __init__(self, section: Mapping) -> None:
+        super().__init__(section)
         self._deploying = False
+        # Set by Cancel during a deploy; _active_proc is the step to kill
+        self._cancel = threading.Event()
+        self._active_proc: subprocess.Popen | None = None
+        # The background image pull, which overlaps the other steps
+        self._pull_proc: subprocess.Popen | None = None
+        # Generated the first time the docker fields are shown
+        self._default_pass: str | None = None
+        self._last_is_docker: bool | None = None
 
     def compose(self) -> ComposeResult:
-        import secrets
-        import string
-
         s = self._sec
         default_method = "existing" if s.get("url") else "docker"
-        alphabet = string.ascii_lowercase + string.digits
-        default_pass = "".join(secrets.choice(alphabet) for _ in range(20))
 
         with Horizontal(id="config-outer"):
             with VerticalScroll(id="config-form"):
                 yield Static("[bold]IPAM Configuration[/bold]  [dim](phpIPAM)[/dim]", id="config-title", markup=True)
 
                 yield Label("Setup Method", classes="field-label")
-                yield Select(
-                    [
-                        ("Deploy phpIPAM with Docker (recommended)", "docker"),
-                        ("Connect to existing phpIPAM server", "existing"),
-                    ],
+                self._f_ipam_method = Select(
+                    _IPAM_METHOD_OPTIONS,
                     value=default_method,
                     id="f-ipam-method",
                 )
+                yield self._f_ipam_method
 
                 # ── Docker deployment fields ──
-                with Vertical(id="ipam-docker-fields"):
+                with Vertical(id="ipam-docker-fields") as self._docker_fields:
                     yield Static(
                         "[dim]Deploys a local phpIPAM instance with MariaDB, "
                         "auto-configured API, and self-signed SSL.[/dim]",
@@ -761,46 +1222,52 @@ IPAMConfigModal {{
                         classes="field-hint",
                     )
                     yield Label("HTTPS Port", classes="field-label")
-                    yield Input(value="8443", placeholder="8443", id="f-docker-port")
+                    self._f_docker_port = Input(value="8443", placeholder="8443", id="f-docker-port")
+                    yield self._f_docker_port
                     yield Label("Admin Password", classes="field-label")
                     with Horizontal(classes="secret-row"):
-                        yield Input(value=default_pass, placeholder="auto-generated", id="f-docker-pass", password=True)
-                        yield Button("Reveal", id="reveal-f-docker-pass", classes="reveal-btn")
-                        yield Button("Copy", id="copy-f-docker-pass", classes="copy-btn")
-                    yield Static("", id="docker-status", markup=True)
+                        self._f_docker_pass = Input(placeholder="auto-generated", id="f-docker-pass", password=True)
+                        yield self._f_docker_pass
+                        yield from _secret_buttons(self._f_docker_pass)
+                    self._docker_status = Static("", id="docker-status", markup=True)
+                    yield self._docker_status
 
                 # ── Existing server fields ──
-                with Vertical(id="ipam-existing-fields"):
+                with Vertical(id="ipam-existing-fields") as self._existing_fields:
                     yield Label("URL", classes="field-label")
-                    yield Input(value=s.get("url", ""), placeholder="e.g. https://ipam.example.com", id="f-url")
+                    self._f_url = Input(value=s.get("url", ""), placeholder="e.g. https://ipam.example.com", id="f-url")
+                    yield self._f_url
 
                     yield Label("App ID", classes="field-label")
-                    yield Input(value=s.get("app_id", "infraforge"), placeholder="infraforge", id="f-app-id")
+                    self._f_app_id = Input(value=s.get("app_id", "infraforge"), placeholder="infraforge", id="f-app-id")
+                    yield self._f_app_id
 
                     yield Label("Token [dim](if token auth)[/dim]", classes="field-label", markup=True)
                     with Horizontal(classes="secret-row"):
-                        yield Input(value=s.get("token", ""), placeholder="API token", id="f-token", password=True)
-                        yield Button("Reveal", id="reveal-f-token", classes="reveal-btn")
-                        yield Button("Copy", id="copy-f-token", classes="copy-btn")
+                        self._f_token = Input(value=s.get("token", ""), placeholder="API token", id="f-token", password=True)
+                        yield self._f_token
+                        yield from _secret_buttons(self._f_token)
 
                     yield Label("Username [dim](if user auth)[/dim]", classes="field-label", markup=True)
-                    yield Input(value=s.get("username", ""), placeholder="admin", id="f-username")
+                    self._f_username = Input(value=s.get("username", ""), placeholder="admin", id="f-username")
+                    yield self._f_username
 
                     yield Label("Password [dim](if user auth)[/dim]", classes="field-label", markup=True)
                     with Horizontal(classes="secret-row"):
-                        yield Input(value=s.get("password", ""), placeholder="", id="f-password", password=True)
-                        yield Button("Reveal", id="reveal-f-password", classes="reveal-btn")
-                        yield Button("Copy", id="copy-f-password", classes="copy-btn")
+                        self._f_password = Input(value=s.get("password", ""), placeholder="", id="f-password", password=True)
+                        yield self._f_password
+                        yield from _secret_buttons(self._f_password)
 
                     yield Label("Verify SSL", classes="field-label")
-                    yield Switch(value=s.get("verify_ssl", False), id="f-verify-ssl")
+                    self._f_verify_ssl = Switch(value=s.get("verify_ssl", False), id="f-verify-ssl")
+                    yield self._f_verify_ssl
 
                 with Horizontal(classes="modal-buttons"):
                     yield Button("Save", id="save-btn", variant="success")
                     yield Button("Cancel", id="cancel-btn")
 
             with VerticalScroll(id="config-help"):
-                yield Static(_IPAM_HELP, id="help-content", markup=True)
+                yield Static(_IPAM_HELP, id="help-content", markup=False)
 
     def on_mount(self) -> None:
         super().on_mount()
@@ -811,175 +1278,222 @@ IPAMConfigModal {{
             self._toggle_method_fields()
 
     def _toggle_method_fields(self) -> None:
-        method = self.query_one("#f-ipam-method", Select).value
-        is_docker = method == "docker"
-        self.query_one("#ipam-docker-fields").display = is_docker
-        self.query_one("#ipam-existing-fields").display = not is_docker
+        is_docker = self._f_ipam_method.value == "docker"
+        if is_docker == self._last_is_docker:
+            return
+        self._last_is_docker = is_docker
+        with self.app.batch_update():
+            self._docker_fields.display = is_docker
+            self._existing_fields.display = not is_docker
+            if is_docker:
+                self._ensure_docker_pass()
+        self._set_hidden(
+            "ipam-existing-fields" if is_docker else "ipam-docker-fields"
+        )
+
+    def _ensure_docker_pass(self) -> None:
+        """Fill the admin password field if it is empty.
+
+        Only called once the docker fields are shown, so editing an
+        existing-server config never generates a password.
+        """
+        if self._f_docker_pass.value:
+            return
+        if self._default_pass is None:
+            self._default_pass = _gen_pass()
+        self._f_docker_pass.value = self._default_pass
 
     def _set_status(self, msg: str) -> None:
-        self.query_one("#docker-status", Static).update(msg)
+        self._docker_status.update(msg)
+
+    def _track(self, proc: subprocess.Popen | None) -> None:
+        """Remember the running deploy step so Cancel can stop it."""
+        self._active_proc = proc
+        if proc is not None and self._cancel.is_set():
+            proc.kill()
+
+    def _run(self, cmd: list[str], timeout: float, **kwargs) -> subprocess.CompletedProcess:
+        """``subprocess.run`` for deploy steps that Cancel can interrupt."""
+        if kwargs.pop("capture_output", False):
+            kwargs["stdout"] = kwargs["stderr"] = subprocess.PIPE
+        with subprocess.Popen(cmd, **kwargs) as proc:
+            self._track(proc)
+            try:
+                out, err = proc.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                raise
+            finally:
+                self._active_proc = None
+        return subprocess.CompletedProcess(cmd, proc.returncode, out, err)
 
     def action_save(self) -> None:
-        method = self.query_one("#f-ipam-method", Select).value
-        if method == "docker":
+        if self._f_ipam_method.value == "docker":
             if self._deploying:
                 return
-            port = self.query_one("#f-docker-port", Input).value.strip() or "8443"
-            admin_pass = self.query_one("#f-docker-pass", Input).value.strip()
+            port = _parse_port(self._f_docker_port.value, 8443)
+            if port is None:
+                self._reject(self._f_docker_port, "Port must be a number from 1 to 65535")
+                return
+            admin_pass = self._f_docker_pass.value.strip()
             if not admin_pass:
-                import secrets, string
-                alphabet = string.ascii_lowercase + string.digits
-                admin_pass = "".join(secrets.choice(alphabet) for _ in range(20))
-            self._deploy_docker(port, admin_pass)
+                admin_pass = _gen_pass()
+            self._deploy_docker(str(port), admin_pass)
         else:
-            url = self.query_one("#f-url", Input).value.strip()
+            url = self._f_url.value.strip()
             if not url:
                 self.notify("URL is required!", severity="error")
                 return
             result = {
                 "provider": "phpipam",
                 "url": url,
-                "app_id": self.query_one("#f-app-id", Input).value.strip() or "infraforge",
-                "token": self.query_one("#f-token", Input).value.strip(),
-                "username": self.query_one("#f-username", Input).value.strip(),
-                "password": self.query_one("#f-password", Input).value.strip(),
-                "verify_ssl": self.query_one("#f-verify-ssl", Switch).value,
+                "app_id": self._f_app_id.value.strip() or "infraforge",
+                "token": self._f_token.value.strip(),
+                "username": self._f_username.value.strip(),
+                "password": self._f_password.value.strip(),
+                "verify_ssl": self._f_verify_ssl.value,
             }
             self.dismiss(result)
 
     @work(thread=True)
     def _deploy_docker(self, port: str, admin_pass: str) -> None:
         """Deploy phpIPAM Docker stack in a background thread."""
-        import secrets
-        import subprocess
-        import time
-        from pathlib import Path
-
         self._deploying = True
+        self._cancel.clear()
         docker_dir = Path(__file__).resolve().parent.parent.parent / "docker"
 
+        last_status = ""
+
         def status(msg: str) -> None:
-            self.app.call_from_thread(self._set_status, f"[bold cyan]{msg}[/bold cyan]")
+            # Each update is a blocking round trip to the UI thread;
+            # don't pay for one that wouldn't change the text.
+            nonlocal last_status
+            if msg != last_status:
+                last_status = msg
+                self.app.call_from_thread(self._set_status, f"[bold cyan]{msg}[/bold cyan]")
 
         def fail(msg: str) -> None:
             self.app.call_from_thread(self._set_status, f"[bold red]{msg}[/bold red]")
             self._deploying = False
 
-        import os
-        import shutil
-        import tempfile
-        import urllib.request as urlreq
+        def cancelled() -> bool:
+            if self._cancel.is_set():
+                fail("Deployment cancelled.")
+                return True
+            return False
 
-        sudo = ["sudo"] if os.geteuid() != 0 else []
-        has_apt = shutil.which("apt-get") is not None
+        sudo = list(_sudo_prefix())
 
         # ── Step 1: Ensure Docker is installed ──
         status("Checking Docker...")
-        docker_ok = False
-        try:
-            r = subprocess.run(["docker", "info"], capture_output=True, timeout=10)
-            docker_ok = r.returncode == 0
-        except FileNotFoundError:
-            pass
+        # Docker and compose are probed together and cached; repeat saves
+        # in the same session only re-check that the daemon is still up.
+        _revalidate_docker_env()
+        prefix, compose = _detect_docker_env()
+        docker_ok = _probe_docker()[0]
 
         if not docker_ok:
-            if not has_apt:
+            _forget_docker_env()
+            if not _has_apt():
                 fail("Docker is not installed and apt is not available.\nInstall Docker manually and retry.")
                 return
             status("Installing Docker...")
             try:
-                subprocess.run(sudo + ["apt-get", "update", "-qq"], capture_output=True, timeout=120)
-                r = subprocess.run(
-                    sudo + ["apt-get", "install", "-y", "docker.io"],
-                    capture_output=True, text=True, timeout=300,
+                # One sudo/apt session; skip recommends to keep the pull small
+                r = self._run(
+                    sudo + [
+                        "bash", "-c",
+                        # No prompts from debconf, needrestart or changed
+                        # config files; no pty for dpkg's output.
+                        # A failed update stops here so its own error is
+                        # reported, not the install's.
+                        (
+                            "export DEBIAN_FRONTEND=noninteractive NEEDRESTART_MODE=a;"
+                            " apt-get -qq update &&"
+                            " apt-get -qq install -y --no-install-recommends"
+                            " -o Dpkg::Use-Pty=0 -o Dpkg::Options::=--force-confold docker.io"
+                        ),
+                    ],
+                    capture_output=True, text=True, timeout=420,
                 )
+                if cancelled():
+                    return
                 if r.returncode != 0:
                     fail(f"Failed to install Docker:\n[dim]{r.stderr.strip()[:200]}[/dim]")
                     return
-                subprocess.run(sudo + ["systemctl", "start", "docker"], capture_output=True, timeout=30)
-                subprocess.run(sudo + ["systemctl", "enable", "docker"], capture_output=True, timeout=30)
+                # Skipped where there's no systemd, e.g. inside a container
+                if _has_systemctl():
+                    subprocess.run(sudo + ["systemctl", "enable", "--now", "docker"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
             except Exception as e:
                 fail(f"Failed to install Docker: {e}")
                 return
 
             # Verify it works now
-            try:
-                r = subprocess.run(sudo + ["docker", "info"], capture_output=True, timeout=10)
-                if r.returncode != 0:
-                    fail("Docker installed but daemon not responding.\n[dim]Try: sudo systemctl start docker[/dim]")
-                    return
-            except Exception:
-                fail("Docker installed but not accessible.")
+            _forget_docker_env()
+            prefix, compose = _detect_docker_env()
+            if not _probe_docker()[0]:
+                fail("Docker installed but daemon not responding.\n[dim]Try: sudo systemctl start docker[/dim]")
                 return
 
         # If docker requires sudo, prefix all docker commands
-        docker_prefix: list[str] = []
-        try:
-            r = subprocess.run(["docker", "info"], capture_output=True, timeout=10)
-            if r.returncode != 0:
-                docker_prefix = sudo
-        except Exception:
-            docker_prefix = sudo
+        docker_prefix = list(prefix)
 
         # ── Step 2: Ensure docker compose is available ──
-        compose_cmd: list[str] | None = None
-        for candidate in [docker_prefix + ["docker", "compose"], ["docker-compose"]]:
-            try:
-                if subprocess.run(candidate + ["version"], capture_output=True, timeout=5).returncode == 0:
-                    compose_cmd = candidate
-                    break
-            except Exception:
-                continue
-
+        compose_cmd = list(compose) if compose else None
         if not compose_cmd:
             status("Installing docker compose v2 plugin...")
             try:
-                arch = subprocess.run(
-                    ["uname", "-m"], capture_output=True, text=True, timeout=5,
-                ).stdout.strip() or "x86_64"
-                compose_url = (
-                    f"https://github.com/docker/compose/releases/latest/download"
-                    f"/docker-compose-linux-{arch}"
+                binary = _compose_download(platform.machine() or "x86_64")
+                plugin_path = "/usr/local/lib/docker/cli-plugins/docker-compose"
+                # install(1) creates the plugin dir and sets the mode under
+                # sudo in one step.
+                r = subprocess.run(
+                    sudo + ["install", "-D", "-m", "0755", str(binary), plugin_path],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30,
                 )
-                plugin_dir = "/usr/local/lib/docker/cli-plugins"
-                plugin_path = f"{plugin_dir}/docker-compose"
-                subprocess.run(sudo + ["mkdir", "-p", plugin_dir], capture_output=True, timeout=10)
-
-                # Download to temp then move (avoids permission issues)
-                tmp = tempfile.mktemp(prefix="docker-compose-")
-                urlreq.urlretrieve(compose_url, tmp)
-                subprocess.run(sudo + ["mv", tmp, plugin_path], capture_output=True, timeout=10)
-                subprocess.run(sudo + ["chmod", "+x", plugin_path], capture_output=True, timeout=10)
+                if r.returncode != 0:
+                    raise RuntimeError(f"could not write {plugin_path}")
             except Exception as e:
                 fail(f"Failed to install docker compose:\n[dim]{e}[/dim]")
                 return
 
-            # Verify
-            for candidate in [docker_prefix + ["docker", "compose"], ["docker-compose"]]:
-                try:
-                    if subprocess.run(candidate + ["version"], capture_output=True, timeout=5).returncode == 0:
-                        compose_cmd = candidate
-                        break
-                except Exception:
-                    continue
-            if not compose_cmd:
+            # The plugin just installed is the one to use; one sanity check
+            # instead of re-probing every compose flavour.
+            _detect_docker_env.cache_clear()
+            compose_cmd = docker_prefix + ["docker", "compose"]
+            if not _compose_works(tuple(compose_cmd)):
                 fail("docker compose installed but not working.")
                 return
 
+        if cancelled():
+            return
+
         # ── Step 3: Check if already running ──
+        states: dict[str, dict] = {}
         try:
+            # One inspect covers every container in the stack, with the
+            # run state and published ports; missing ones are just absent.
             r = subprocess.run(
-                docker_prefix + ["docker", "inspect", "--format", "{{.State.Running}}", "infraforge-ipam-web"],
+                docker_prefix + [
+                    "docker", "inspect", "--format",
+                    (
+                        '{"name": {{json .Name}}, "running": {{json .State.Running}},'
+                        ' "ports": {{json .NetworkSettings.Ports}}}'
+                    ),
+                    *_IPAM_CONTAINERS,
+                ],
                 capture_output=True, text=True, timeout=5,
             )
-            if r.stdout.strip() == "true":
+            for line in r.stdout.splitlines():
+                if line.strip():
+                    st = json.loads(line)
+                    states[st["name"].lstrip("/")] = st
+            state = states.get("infraforge-ipam-web", {})
+            if all(states.get(name, {}).get("running") for name in _IPAM_CONTAINERS):
                 status("phpIPAM containers already running — using existing deployment.")
-                existing_port = port
-                env_file = docker_dir / ".env"
-                if env_file.exists():
-                    for line in env_file.read_text().splitlines():
-                        if line.startswith("IPAM_PORT="):
-                            existing_port = line.split("=", 1)[1].strip()
+                bindings = (state.get("ports") or {}).get("443/tcp") or []
+                existing_port = bindings[0].get("HostPort") if bindings else ""
+                existing_port = existing_port or port
                 time.sleep(1)
                 self._deploying = False
                 self.app.call_from_thread(self.dismiss, {
@@ -995,52 +1509,96 @@ IPAMConfigModal {{
         except Exception:
             pass
 
-        # ── Step 4: Generate SSL certs ──
-        status("Generating SSL certificate...")
-        ssl_script = docker_dir / "phpipam" / "generate-ssl.sh"
-        if ssl_script.exists():
-            subprocess.run(
-                ["bash", str(ssl_script)],
-                cwd=str(docker_dir / "phpipam"),
-                capture_output=True, timeout=15,
-            )
+        # Pull images in the background while certs/credentials are
+        # prepared, so `up -d` below doesn't start with a cold pull.
+        compose_file = str(docker_dir / "docker-compose.yml")
 
-        # ── Step 5: Generate passwords + admin hash + write .env ──
-        status("Generating credentials...")
-        db_pass = secrets.token_urlsafe(16)
-        db_root_pass = secrets.token_urlsafe(16)
-
-        admin_hash = ""
-        escaped_pass = admin_pass.replace("'", "\\'")
-        php_code = f"echo password_hash('{escaped_pass}', PASSWORD_DEFAULT);"
-        for php_cmd in [
-            docker_prefix + ["docker", "run", "--rm", "php:cli", "php", "-r", php_code],
-            docker_prefix + ["docker", "run", "--rm", "phpipam/phpipam-www:latest", "php", "-r", php_code],
-        ]:
+        def pull_images() -> None:
             try:
-                r = subprocess.run(php_cmd, capture_output=True, text=True, timeout=60)
-                if r.returncode == 0 and r.stdout.strip().startswith("$2"):
-                    admin_hash = r.stdout.strip()
-                    break
-            except Exception:
-                continue
+                with subprocess.Popen(
+                    compose_cmd + ["-f", compose_file, "pull", "--quiet"],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                ) as proc:
+                    self._pull_proc = proc
+                    if self._cancel.is_set():
+                        proc.kill()
+                    try:
+                        proc.wait(timeout=600)
+                    except subprocess.TimeoutExpired:
+                        proc.kill()
+            except OSError:
+                pass  # `up -d` pulls anything still missing
+            finally:
+                self._pull_proc = None
+
+        pull_thread = threading.Thread(target=pull_images, daemon=True)
+        pull_thread.start()
+
+        # Any container left from an earlier deploy means the DB volume
+        # was initialised with .env's credentials (and admin hash), so a
+        # partly stopped stack is started as-is; regenerating would rotate
+        # the DB passwords out from under the existing volumes.
+        env_file = docker_dir / ".env"
+        env = _parse_env(env_file) if states else {}
+        if env.get("IPAM_DB_PASS"):
+            status("Existing phpIPAM stack found — starting it with its current configuration.")
+            port = env.get("IPAM_PORT") or port
+            admin_hash = env.get("IPAM_ADMIN_HASH", "").replace("$$", "$")
+            if not _hash_matches(admin_pass, admin_hash):
+                # The stored hash is what the DB was seeded with, so the
+                # entered password can't log in; don't save it as if it could.
+                fail(
+                    "An existing phpIPAM stack uses a different admin password.\n"
+                    "[dim]Enter that password, or use Repair to redeploy with fresh credentials.[/dim]"
+                )
+                return
+        else:
+            # ── Step 4: Generate SSL certs ──
+            # If this falls back to the shell script, it runs in the
+            # background while the admin hash is computed below.
+            status("Generating SSL certificate and credentials...")
+            ssl_proc = _ensure_ssl_cert(docker_dir / "phpipam")
 
-        env_lines = [
-            f"IPAM_DB_ROOT_PASS={db_root_pass}",
-            f"IPAM_DB_PASS={db_pass}",
-            f"IPAM_PORT={port}",
-            "SCAN_INTERVAL=15m",
-        ]
-        if admin_hash:
-            env_lines.append(f"IPAM_ADMIN_HASH={admin_hash.replace('$', '$$')}")
-        (docker_dir / ".env").write_text("\n".join(env_lines) + "\n")
+            # ── Step 5: Generate passwords + admin hash + write .env ──
+            db_pass, db_root_pass = _gen_db_passes()
+
+            admin_hash = _php_password_hash(admin_pass)
+
+            if ssl_proc is not None:
+                try:
+                    ssl_proc.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    ssl_proc.kill()
+
+            env_lines = [
+                f"IPAM_DB_ROOT_PASS={db_root_pass}",
+                f"IPAM_DB_PASS={db_pass}",
+                f"IPAM_PORT={port}",
+                "SCAN_INTERVAL=15m",
+                f"IPAM_ADMIN_HASH={admin_hash.replace('$', '$$')}",
+            ]
+            _write_env(env_file, env_lines)
 
         # ── Step 6: Launch containers ──
+        if cancelled():
+            return
         status("Starting containers...")
-        r = subprocess.run(
-            compose_cmd + ["-f", str(docker_dir / "docker-compose.yml"), "up", "-d"],
-            capture_output=True, text=True, timeout=120,
-        )
+        # Short joins so Cancel (which kills the pull) is noticed promptly
+        while pull_thread.is_alive() and not self._cancel.is_set():
+            pull_thread.join(timeout=0.5)
+        if cancelled():
+            return
+        try:
+            r = self._run(
+                compose_cmd + ["-f", compose_file, "up", "-d", "--quiet-pull", "--no-color"],
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=120,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            if not cancelled():
+                fail(f"Failed to start containers:\n[dim]{e}[/dim]")
+            return
+        if cancelled():
+            return
         if r.returncode != 0:
             err = r.stderr.strip()[:200]
             fail(f"Failed to start containers:\n[dim]{err}[/dim]")
@@ -1048,25 +1606,14 @@ IPAMConfigModal {{
 
         # ── Step 7: Wait for readiness ──
         status("Waiting for phpIPAM to start (may take 30-60s)...")
-        import ssl as ssl_mod
-        import urllib.request
 
         url = f"https://localhost:{port}"
-        ready = False
-        for _ in range(60):
-            try:
-                ctx = ssl_mod.create_default_context()
-                ctx.check_hostname = False
-                ctx.verify_mode = ssl_mod.CERT_NONE
-                req = urllib.request.Request(url)
-                with urllib.request.urlopen(req, timeout=3, context=ctx) as resp:
-                    if resp.status in (200, 301, 302):
-                        time.sleep(5)
-                        ready = True
-                        break
-            except Exception:
-                pass
-            time.sleep(3)
+        ready = _wait_ready(
+            docker_prefix, int(port), track=self._track, stop=self._cancel,
+        )
+        self._active_proc = None
+        if cancelled():
+            return
 
         if not ready:
             fail("phpIPAM did not become ready in time.\n[dim]Check: docker logs infraforge-ipam-web[/dim]")
@@ -1074,38 +1621,26 @@ IPAMConfigModal {{
 
         # ── Step 8: Verify API ──
         status("Verifying API connectivity...")
-        api_ok = False
-        for _ in range(5):
-            try:
-                from infraforge.config import Config, IPAMConfig
-                from infraforge.ipam_client import IPAMClient
-
-                cfg = Config()
-                cfg.ipam = IPAMConfig(
-                    provider="phpipam", url=url, app_id="infraforge",
-                    token="", username="Admin", password=admin_pass,
-                    verify_ssl=False,
-                )
-                client = IPAMClient(cfg)
-                if client.check_health():
-                    api_ok = True
-                    break
-            except Exception:
-                pass
-            time.sleep(3)
+        api_ok = _verify_admin_api(url, admin_pass)
 
-        actual_pass = admin_pass
-        if not api_ok and not admin_hash:
+        # An unverified password isn't saved; the config is left for the
+        # user to complete once they can log in.
+        actual_pass = admin_pass if api_ok else ""
+        if api_ok:
+            login = f"Admin / {actual_pass}"
+        else:
+            login = "admin password not verified"
             self.app.call_from_thread(
                 self.notify,
-                "Could not verify admin password — check phpIPAM web UI to set it",
+                "Could not verify admin password — it was not saved. "
+                "Check the phpIPAM web UI, then set it in the IPAM config.",
                 severity="warning",
             )
 
         self.app.call_from_thread(
             self._set_status,
             f"[bold green]phpIPAM deployed at {url}[/bold green]\n"
-            f"[dim]Web UI: {url}  (Admin / {actual_pass})[/dim]",
+            f"[dim]Web UI: {url}  ({login})[/dim]",
         )
 
         result = {
@@ -1123,7 +1658,14 @@ IPAMConfigModal {{
 
     def action_cancel(self) -> None:
         if self._deploying:
-            self.notify("Deployment in progress — please wait", severity="warning")
+            # Stop the running step; the worker reports back and the
+            # modal can then be closed normally.
+            if not self._cancel.is_set():
+                self._cancel.set()
+                for proc in (self._active_proc, self._pull_proc):
+                    if proc is not None:
+                        proc.terminate()
+                self.notify("Cancelling deployment...", severity="warning")
             return
         self.dismiss(None)
 
@@ -1217,11 +1759,12 @@ class IPAMRepairModal(ModalScreen):
 
     def compose(self) -> ComposeResult:
         with Vertical(id="repair-box"):
-            yield Static(id="repair-status", markup=True)
+            self._status = Static(id="repair-status", markup=True)
+            yield self._status
 
     def on_mount(self) -> None:
         if self._destructive:
-            self.query_one("#repair-status", Static).update(
+            self._status.update(
                 "[bold yellow]Destructive Repair — phpIPAM[/bold yellow]\n\n"
                 "This will:\n"
                 "  1. Stop all phpIPAM containers\n"
@@ -1233,7 +1776,7 @@ class IPAMRepairModal(ModalScreen):
                 "  [bold white on dark_red] n [/bold white on dark_red] Cancel"
             )
         else:
-            self.query_one("#repair-status", Static).update(
+            self._status.update(
                 "[bold cyan]Non-destructive Repair — phpIPAM[/bold cyan]\n\n"
                 "This will:\n"
                 "  1. Stop all phpIPAM containers\n"
@@ -1269,41 +1812,19 @@ class IPAMRepairModal(ModalScreen):
 
     def _update(self, msg: str) -> None:
         self.app.call_from_thread(
-            self.query_one("#repair-status", Static).update, msg
+            self._status.update, msg
         )
 
     @work(thread=True, exclusive=True)
     def _run_repair(self) -> None:
         """Tear down and redeploy phpIPAM in a background thread."""
-        import os
-        import secrets
-        import shutil
-        import subprocess
-        import time
-        from pathlib import Path
-
         docker_dir = Path(__file__).resolve().parent.parent.parent / "docker"
-        sudo = ["sudo"] if os.geteuid() != 0 else []
-
-        # Detect docker prefix
-        docker_prefix: list[str] = []
-        try:
-            r = subprocess.run(["docker", "info"], capture_output=True, timeout=10)
-            if r.returncode != 0:
-                docker_prefix = sudo
-        except Exception:
-            docker_prefix = sudo
-
-        # Find compose command
-        compose_cmd: list[str] | None = None
-        for candidate in [docker_prefix + ["docker", "compose"], ["docker-compose"]]:
-            try:
-                if subprocess.run(candidate + ["version"], capture_output=True, timeout=5).returncode == 0:
-                    compose_cmd = candidate
-                    break
-            except Exception:
-                continue
 
+        # Detect docker prefix and compose command
+        _revalidate_docker_env()
+        prefix, compose = _detect_docker_env()
+        docker_prefix = list(prefix)
+        compose_cmd = list(compose) if compose else None
         if not compose_cmd:
             self._update(
                 "[bold red]docker compose not found![/bold red]\n\n"
@@ -1316,7 +1837,7 @@ class IPAMRepairModal(ModalScreen):
 
         # Non-destructive: just restart containers
         if not self._destructive:
-            self._run_soft_repair(compose_cmd, docker_dir)
+            self._run_soft_repair(docker_prefix, compose_cmd, docker_dir)
             return
 
         # Step 1: Tear down
@@ -1353,13 +1874,12 @@ class IPAMRepairModal(ModalScreen):
             "  [green]\u2713[/green] Containers removed\n"
             "  Step 2/6: Generating SSL certificate..."
         )
-        ssl_script = docker_dir / "phpipam" / "generate-ssl.sh"
-        if ssl_script.exists():
-            subprocess.run(
-                ["bash", str(ssl_script)],
-                cwd=str(docker_dir / "phpipam"),
-                capture_output=True, timeout=15,
-            )
+        ssl_proc = _ensure_ssl_cert(docker_dir / "phpipam")
+        if ssl_proc is not None:
+            try:
+                ssl_proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                ssl_proc.kill()
 
         # Step 3: Generate fresh credentials
         self._update(
@@ -1368,38 +1888,13 @@ class IPAMRepairModal(ModalScreen):
             "  [green]\u2713[/green] SSL certificate generated\n"
             "  Step 3/6: Generating fresh credentials..."
         )
-        import string
-        alphabet = string.ascii_lowercase + string.digits
-        admin_pass = "".join(secrets.choice(alphabet) for _ in range(20))
-        db_pass = secrets.token_urlsafe(16)
-        db_root_pass = secrets.token_urlsafe(16)
-        port = "8443"
-
-        # Read existing port from .env if it exists
-        env_file = docker_dir / ".env"
-        if env_file.exists():
-            try:
-                for line in env_file.read_text().splitlines():
-                    if line.startswith("IPAM_PORT="):
-                        port = line.split("=", 1)[1].strip()
-            except Exception:
-                pass
+        admin_pass = _gen_pass()
+        db_pass, db_root_pass = _gen_db_passes()
+        # Keep the existing port from .env if there is one
+        port = _parse_env(docker_dir / ".env").get("IPAM_PORT") or "8443"
 
         # Generate admin password hash
-        admin_hash = ""
-        escaped_pass = admin_pass.replace("'", "\\'")
-        php_code = f"echo password_hash('{escaped_pass}', PASSWORD_DEFAULT);"
-        for php_cmd in [
-            docker_prefix + ["docker", "run", "--rm", "php:cli", "php", "-r", php_code],
-            docker_prefix + ["docker", "run", "--rm", "phpipam/phpipam-www:latest", "php", "-r", php_code],
-        ]:
-            try:
-                r = subprocess.run(php_cmd, capture_output=True, text=True, timeout=60)
-                if r.returncode == 0 and r.stdout.strip().startswith("$2"):
-                    admin_hash = r.stdout.strip()
-                    break
-            except Exception:
-                continue
+        admin_hash = _php_password_hash(admin_pass)
 
         # Step 4: Write .env
         self._update(
@@ -1414,10 +1909,9 @@ class IPAMRepairModal(ModalScreen):
             f"IPAM_DB_PASS={db_pass}",
             f"IPAM_PORT={port}",
             "SCAN_INTERVAL=15m",
+            f"IPAM_ADMIN_HASH={admin_hash.replace('$', '$$')}",
         ]
-        if admin_hash:
-            env_lines.append(f"IPAM_ADMIN_HASH={admin_hash.replace('$', '$$')}")
-        (docker_dir / ".env").write_text("\n".join(env_lines) + "\n")
+        _write_env(docker_dir / ".env", env_lines)
 
         # Step 5: Launch containers
         self._update(
@@ -1429,8 +1923,8 @@ class IPAMRepairModal(ModalScreen):
             "  Step 5/6: Starting containers..."
         )
         r = subprocess.run(
-            compose_cmd + ["-f", str(docker_dir / "docker-compose.yml"), "up", "-d"],
-            capture_output=True, text=True, timeout=120,
+            compose_cmd + ["-f", str(docker_dir / "docker-compose.yml"), "up", "-d", "--quiet-pull", "--no-color"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=120,
         )
         if r.returncode != 0:
             self._update(
@@ -1452,25 +1946,9 @@ class IPAMRepairModal(ModalScreen):
             "  [green]\u2713[/green] Containers started\n"
             "  Step 6/6: Waiting for phpIPAM to start (may take 30-60s)..."
         )
-        import ssl as ssl_mod
-        import urllib.request
 
         url = f"https://localhost:{port}"
-        ready = False
-        for _ in range(60):
-            try:
-                ctx = ssl_mod.create_default_context()
-                ctx.check_hostname = False
-                ctx.verify_mode = ssl_mod.CERT_NONE
-                req = urllib.request.Request(url)
-                with urllib.request.urlopen(req, timeout=3, context=ctx) as resp:
-                    if resp.status in (200, 301, 302):
-                        time.sleep(5)
-                        ready = True
-                        break
-            except Exception:
-                pass
-            time.sleep(3)
+        ready = _wait_ready(docker_prefix, int(port))
 
         if not ready:
             self._update(
@@ -1484,24 +1962,7 @@ class IPAMRepairModal(ModalScreen):
             return
 
         # Verify API
-        api_ok = False
-        for _ in range(5):
-            try:
-                from infraforge.config import Config, IPAMConfig
-                from infraforge.ipam_client import IPAMClient
-                cfg = Config()
-                cfg.ipam = IPAMConfig(
-                    provider="phpipam", url=url, app_id="infraforge",
-                    token="", username="Admin", password=admin_pass,
-                    verify_ssl=False,
-                )
-                client = IPAMClient(cfg)
-                if client.check_health():
-                    api_ok = True
-                    break
-            except Exception:
-                pass
-            time.sleep(3)
+        api_ok = _verify_admin_api(url, admin_pass)
 
         if api_ok:
             self._update(
@@ -1532,11 +1993,8 @@ class IPAMRepairModal(ModalScreen):
         self._phase = "done"
         self._success = True
 
-    def _run_soft_repair(self, compose_cmd: list[str], docker_dir) -> None:
+    def _run_soft_repair(self, docker_prefix: list[str], compose_cmd: list[str], docker_dir) -> None:
         """Restart containers without wiping data."""
-        import subprocess
-        import time
-
         # Step 1: Stop containers
         self._update(
             "[bold cyan]Repairing phpIPAM (non-destructive)...[/bold cyan]\n\n"
@@ -1572,8 +2030,8 @@ class IPAMRepairModal(ModalScreen):
             "  Step 2/3: Starting containers..."
         )
         r = subprocess.run(
-            compose_cmd + ["-f", str(docker_dir / "docker-compose.yml"), "up", "-d"],
-            capture_output=True, text=True, timeout=120,
+            compose_cmd + ["-f", str(docker_dir / "docker-compose.yml"), "up", "-d", "--quiet-pull", "--no-color"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=120,
         )
         if r.returncode != 0:
             self._update(
@@ -1592,36 +2050,12 @@ class IPAMRepairModal(ModalScreen):
             "  [green]\u2713[/green] Containers started\n"
             "  Step 3/3: Waiting for phpIPAM to start..."
         )
-        import ssl as ssl_mod
-        import urllib.request
 
         # Read port from .env
-        port = "8443"
-        env_file = docker_dir / ".env"
-        if env_file.exists():
-            try:
-                for line in env_file.read_text().splitlines():
-                    if line.startswith("IPAM_PORT="):
-                        port = line.split("=", 1)[1].strip()
-            except Exception:
-                pass
+        port = _parse_env(docker_dir / ".env").get("IPAM_PORT") or "8443"
 
         url = f"https://localhost:{port}"
-        ready = False
-        for _ in range(60):
-            try:
-                ctx = ssl_mod.create_default_context()
-                ctx.check_hostname = False
-                ctx.verify_mode = ssl_mod.CERT_NONE
-                req = urllib.request.Request(url)
-                with urllib.request.urlopen(req, timeout=3, context=ctx) as resp:
-                    if resp.status in (200, 301, 302):
-                        time.sleep(3)
-                        ready = True
-                        break
-            except Exception:
-                pass
-            time.sleep(3)
+        ready = _wait_ready(docker_prefix, int(port))
 
         if ready:
             self._update(
@@ -1648,23 +2082,7 @@ class IPAMRepairModal(ModalScreen):
 
 class TerraformConfigModal(_ArrowNavModal):
 
-    BINDINGS = [
-        Binding("ctrl+s", "save", "Save", show=False),
-        Binding("escape", "cancel", "Cancel", show=True),
-    ]
-
-    DEFAULT_CSS = f"""
-TerraformConfigModal {{
-{_MODAL_ALIGN}
-}}
-""" + _BOX_CSS
-
-    def __init__(self, section: dict) -> None:
-        super().__init__()
-        self._sec = section
-
     def compose(self) -> ComposeResult:
-        from infraforge.config import _resolve_path
         s = self._sec
         default_workspace = _resolve_path("", "./terraform")
         with Horizontal(id="config-outer"):
@@ -1672,33 +2090,31 @@ TerraformConfigModal {{
                 yield Static("[bold]Terraform Configuration[/bold]", id="config-title", markup=True)
 
                 yield Label("Workspace Directory", classes="field-label")
-                yield Input(value=s.get("workspace", default_workspace), placeholder=default_workspace, id="f-workspace")
+                self._f_workspace = Input(value=s.get("workspace", default_workspace), placeholder=default_workspace, id="f-workspace")
+                yield self._f_workspace
 
                 yield Label("State Backend", classes="field-label")
-                yield Select(
-                    [("Local", "local"), ("S3", "s3"), ("Consul", "consul")],
+                self._f_backend = Select(
+                    _STATE_BACKEND_OPTIONS,
                     value=s.get("state_backend", "local"),
                     id="f-backend",
                 )
+                yield self._f_backend
 
                 with Horizontal(classes="modal-buttons"):
                     yield Button("Save", id="save-btn", variant="success")
                     yield Button("Cancel", id="cancel-btn")
 
             with VerticalScroll(id="config-help"):
-                yield Static(_TERRAFORM_HELP, id="help-content", markup=True)
+                yield Static(_TERRAFORM_HELP, id="help-content", markup=False)
 
     def action_save(self) -> None:
-        from infraforge.config import _resolve_path
         result = {
-            "workspace": _resolve_path(self.query_one("#f-workspace", Input).value.strip(), "./terraform"),
-            "state_backend": self.query_one("#f-backend", Select).value,
+            "workspace": _resolve_path(self._f_workspace.value.strip(), "./terraform"),
+            "state_backend": self._f_backend.value,
         }
         self.dismiss(result)
 
-    def action_cancel(self) -> None:
-        self.dismiss(None)
-
 
 # ── Ansible Config Modal ──────────────────────────────────────────
 
@@ -1708,23 +2124,7 @@ class AnsibleConfigModal(_ArrowNavModal):
     def _help_cmds(self):
         return _get_ansible_cmds()
 
-    BINDINGS = [
-        Binding("ctrl+s", "save", "Save", show=False),
-        Binding("escape", "cancel", "Cancel", show=True),
-    ]
-
-    DEFAULT_CSS = f"""
-AnsibleConfigModal {{
-{_MODAL_ALIGN}
-}}
-""" + _BOX_CSS
-
-    def __init__(self, section: dict) -> None:
-        super().__init__()
-        self._sec = section
-
     def compose(self) -> ComposeResult:
-        from infraforge.config import _resolve_path
         s = self._sec
         default_pdir = _resolve_path("", "./ansible/playbooks")
         with Horizontal(id="config-outer"):
@@ -1732,45 +2132,27 @@ AnsibleConfigModal {{
                 yield Static("[bold]Ansible Configuration[/bold]", id="config-title", markup=True)
 
                 yield Label("Playbook Directory", classes="field-label")
-                yield Input(value=s.get("playbook_dir", default_pdir), placeholder=default_pdir, id="f-playbook-dir")
+                self._f_playbook_dir = Input(value=s.get("playbook_dir", default_pdir), placeholder=default_pdir, id="f-playbook-dir")
+                yield self._f_playbook_dir
 
                 with Horizontal(classes="modal-buttons"):
                     yield Button("Save", id="save-btn", variant="success")
                     yield Button("Cancel", id="cancel-btn")
 
             with VerticalScroll(id="config-help"):
-                yield Static(_ANSIBLE_HELP, id="help-content", markup=True)
+                yield Static(_ANSIBLE_HELP, id="help-content", markup=False)
 
     def action_save(self) -> None:
-        from infraforge.config import _resolve_path
         result = {
-            "playbook_dir": _resolve_path(self.query_one("#f-playbook-dir", Input).value.strip(), "./ansible/playbooks"),
+            "playbook_dir": _resolve_path(self._f_playbook_dir.value.strip(), "./ansible/playbooks"),
         }
         self.dismiss(result)
 
-    def action_cancel(self) -> None:
-        self.dismiss(None)
-
 
 # ── AI Config Modal ────────────────────────────────────────────────
 
 class AIConfigModal(_ArrowNavModal):
 
-    BINDINGS = [
-        Binding("ctrl+s", "save", "Save", show=False),
-        Binding("escape", "cancel", "Cancel", show=True),
-    ]
-
-    DEFAULT_CSS = f"""
-AIConfigModal {{
-{_MODAL_ALIGN}
-}}
-""" + _BOX_CSS
-
-    def __init__(self, section: dict) -> None:
-        super().__init__()
-        self._sec = section
-
     def compose(self) -> ComposeResult:
         s = self._sec
         with Horizontal(id="config-outer"):
@@ -1779,63 +2161,44 @@ AIConfigModal {{
 
                 yield Label("API Key", classes="field-label")
                 with Horizontal(classes="secret-row"):
-                    yield Input(value=s.get("api_key", ""), placeholder="sk-ant-api03-...", id="f-api-key", password=True)
-                    yield Button("Reveal", id="reveal-f-api-key", classes="reveal-btn")
-                    yield Button("Copy", id="copy-f-api-key", classes="copy-btn")
+                    self._f_api_key = Input(value=s.get("api_key", ""), placeholder="sk-ant-api03-...", id="f-api-key", password=True)
+                    yield self._f_api_key
+                    yield from _secret_buttons(self._f_api_key)
 
                 yield Label("Model", classes="field-label")
-                yield Select(
-                    [
-                        ("Claude Opus 4.6", "claude-opus-4-6"),
-                        ("Claude Sonnet 4.5", "claude-sonnet-4-5-20250929"),
-                        ("Claude Haiku 4.5", "claude-haiku-4-5-20251001"),
-                    ],
+                self._f_model = Select(
+                    _AI_MODEL_OPTIONS,
                     value=s.get("model", "claude-sonnet-4-5-20250929"),
                     id="f-model",
                 )
+                yield self._f_model
 
                 with Horizontal(classes="modal-buttons"):
                     yield Button("Save", id="save-btn", variant="success")
                     yield Button("Cancel", id="cancel-btn")
 
             with VerticalScroll(id="config-help"):
-                yield Static(_AI_HELP, id="help-content", markup=True)
+                yield Static(_AI_HELP, id="help-content", markup=False)
 
     def action_save(self) -> None:
-        key = self.query_one("#f-api-key", Input).value.strip()
         result = {
             "provider": "anthropic",
-            "api_key": key,
-            "model": self.query_one("#f-model", Select).value,
+            "api_key": self._f_api_key.value.strip(),
+            "model": self._f_model.value,
         }
         self.dismiss(result)
 
-    def action_cancel(self) -> None:
-        self.dismiss(None)
-
 
 # ── Cloudflare Config Modal ────────────────────────────────────────
 
 class CloudflareConfigModal(_ArrowNavModal):
 
-    BINDINGS = [
-        Binding("ctrl+s", "save", "Save", show=False),
-        Binding("escape", "cancel", "Cancel", show=True),
-    ]
-
-    DEFAULT_CSS = f"""
-CloudflareConfigModal {{
-{_MODAL_ALIGN}
-}}
-#cf-zone-status {{
+    DEFAULT_CSS = """
+#cf-zone-status {
     height: auto;
     margin: 1 0 0 0;
-}}
-""" + _BOX_CSS
-
-    def __init__(self, section: dict) -> None:
-        super().__init__()
-        self._sec = section
+}
+"""
 
     def compose(self) -> ComposeResult:
         s = self._sec
@@ -1845,18 +2208,19 @@ CloudflareConfigModal {{
 
                 yield Label("API Token", classes="field-label")
                 with Horizontal(classes="secret-row"):
-                    yield Input(value=s.get("api_token", ""), placeholder="Cloudflare API token", id="f-cf-token", password=True)
-                    yield Button("Reveal", id="reveal-f-cf-token", classes="reveal-btn")
-                    yield Button("Copy", id="copy-f-cf-token", classes="copy-btn")
+                    self._f_cf_token = Input(value=s.get("api_token", ""), placeholder="Cloudflare API token", id="f-cf-token", password=True)
+                    yield self._f_cf_token
+                    yield from _secret_buttons(self._f_cf_token)
 
-                yield Static("", id="cf-zone-status", markup=True)
+                self._zone_status = Static("", id="cf-zone-status", markup=True)
+                yield self._zone_status
 
                 with Horizontal(classes="modal-buttons"):
                     yield Button("Save", id="save-btn", variant="success")
                     yield Button("Cancel", id="cancel-btn")
 
             with VerticalScroll(id="config-help"):
-                yield Static(_CLOUDFLARE_HELP, id="help-content", markup=True)
+                yield Static(_CLOUDFLARE_HELP, id="help-content", markup=False)
 
     def on_mount(self) -> None:
         super().on_mount()
@@ -1876,7 +2240,7 @@ CloudflareConfigModal {{
     def _discover_zones(self, token: str) -> None:
         """Try to list zones using the provided token."""
         self.app.call_from_thread(
-            self.query_one("#cf-zone-status", Static).update,
+            self._zone_status.update,
             "[dim]Verifying token and discovering zones...[/dim]"
         )
         try:
@@ -1888,7 +2252,7 @@ CloudflareConfigModal {{
                 client.verify_token()
             except CloudflareError as e:
                 self.app.call_from_thread(
-                    self.query_one("#cf-zone-status", Static).update,
+                    self._zone_status.update,
                     f"[red]Invalid token: {e}[/red]"
                 )
                 return
@@ -1897,7 +2261,7 @@ CloudflareConfigModal {{
             zones = client.list_zones()
             if not zones:
                 self.app.call_from_thread(
-                    self.query_one("#cf-zone-status", Static).update,
+                    self._zone_status.update,
                     "[yellow]Token valid but no zones found.[/yellow]\n"
                     "[dim]Check token permissions include Zone → Zone → Read[/dim]"
                 )
@@ -1917,18 +2281,17 @@ CloudflareConfigModal {{
                 )
 
             self.app.call_from_thread(
-                self.query_one("#cf-zone-status", Static).update,
+                self._zone_status.update,
                 "\n".join(lines)
             )
         except Exception as e:
-            from rich.markup import escape
             self.app.call_from_thread(
-                self.query_one("#cf-zone-status", Static).update,
+                self._zone_status.update,
                 f"[red]Error: {escape(str(e))}[/red]"
             )
 
     def action_save(self) -> None:
-        token = self.query_one("#f-cf-token", Input).value.strip()
+        token = self._f_cf_token.value.strip()
         if not token:
             self.notify("API token is required!", severity="error")
             return
@@ -1937,13 +2300,10 @@ CloudflareConfigModal {{
         }
         self.dismiss(result)
 
-    def action_cancel(self) -> None:
-        self.dismiss(None)
-
 
 # ── Defaults Config Modal ────────────────────────────────────────
 
-_DEFAULTS_HELP = (
+_DEFAULTS_HELP = Text.from_markup(
     "[bold]Defaults Configuration[/bold]\n\n"
     "[bold cyan]Exports Directory[/bold cyan]\n"
     "  Directory for exported/imported VM template\n"
@@ -1957,70 +2317,91 @@ _DEFAULTS_HELP = (
 
 class DefaultsConfigModal(_ArrowNavModal):
 
-    BINDINGS = [
-        Binding("ctrl+s", "save", "Save", show=False),
-        Binding("escape", "cancel", "Cancel", show=True),
-    ]
-
-    DEFAULT_CSS = f"""
-DefaultsConfigModal {{
-{_MODAL_ALIGN}
-}}
-""" + _BOX_CSS
-
-    def __init__(self, section: dict) -> None:
-        super().__init__()
-        self._sec = section
-
     def compose(self) -> ComposeResult:
         s = self._sec
-        from pathlib import Path
         default_dir = str(Path.home() / "infraforge" / "vm-templates")
         with Horizontal(id="config-outer"):
             with VerticalScroll(id="config-form"):
                 yield Static("[bold]Defaults Configuration[/bold]", id="config-title", markup=True)
 
                 yield Label("Exports Directory", classes="field-label")
-                yield Input(
+                self._f_exports_dir = Input(
                     value=s.get("exports_dir", ""),
                     placeholder=default_dir,
                     id="f-exports-dir",
                 )
+                yield self._f_exports_dir
 
                 yield Label("CPU Cores", classes="field-label")
-                yield Input(value=str(s.get("cpu_cores", 2)), id="f-cpu-cores")
+                self._f_cpu_cores = Input(value=str(s.get("cpu_cores", 2)), id="f-cpu-cores")
+                yield self._f_cpu_cores
 
                 yield Label("Memory (MB)", classes="field-label")
-                yield Input(value=str(s.get("memory_mb", 2048)), id="f-memory-mb")
+                self._f_memory_mb = Input(value=str(s.get("memory_mb", 2048)), id="f-memory-mb")
+                yield self._f_memory_mb
 
                 yield Label("Disk (GB)", classes="field-label")
-                yield Input(value=str(s.get("disk_gb", 20)), id="f-disk-gb")
+                self._f_disk_gb = Input(value=str(s.get("disk_gb", 20)), id="f-disk-gb")
+                yield self._f_disk_gb
 
                 yield Label("Storage", classes="field-label")
-                yield Input(value=s.get("storage", "local-lvm"), placeholder="local-lvm", id="f-storage")
+                self._f_storage = Input(value=s.get("storage", "local-lvm"), placeholder="local-lvm", id="f-storage")
+                yield self._f_storage
 
                 yield Label("Network Bridge", classes="field-label")
-                yield Input(value=s.get("network_bridge", "vmbr0"), placeholder="vmbr0", id="f-bridge")
+                self._f_bridge = Input(value=s.get("network_bridge", "vmbr0"), placeholder="vmbr0", id="f-bridge")
+                yield self._f_bridge
 
                 with Horizontal(classes="modal-buttons"):
                     yield Button("Save", id="save-btn", variant="success")
                     yield Button("Cancel", id="cancel-btn")
 
             with VerticalScroll(id="config-help"):
-                yield Static(_DEFAULTS_HELP, id="help-content", markup=True)
+                yield Static(_DEFAULTS_HELP, id="help-content", markup=False)
 
     def action_save(self) -> None:
+        numbers = {}
+        for key, field, label, default in (
+            ("cpu_cores", self._f_cpu_cores, "CPU Cores", 2),
+            ("memory_mb", self._f_memory_mb, "Memory (MB)", 2048),
+            ("disk_gb", self._f_disk_gb, "Disk (GB)", 20),
+        ):
+            value = _parse_int(field.value, default, minimum=1)
+            if value is None:
+                self._reject(field, f"{label} must be a whole number of at least 1")
+                return
+            numbers[key] = value
         result = {
-            "exports_dir": self.query_one("#f-exports-dir", Input).value.strip(),
-            "cpu_cores": int(self.query_one("#f-cpu-cores", Input).value.strip() or 2),
-            "memory_mb": int(self.query_one("#f-memory-mb", Input).value.strip() or 2048),
-            "disk_gb": int(self.query_one("#f-disk-gb", Input).value.strip() or 20),
-            "storage": self.query_one("#f-storage", Input).value.strip() or "local-lvm",
-            "network_bridge": self.query_one("#f-bridge", Input).value.strip() or "vmbr0",
+            "exports_dir": self._f_exports_dir.value.strip(),
+            **numbers,
+            "storage": self._f_storage.value.strip() or "local-lvm",
+            "network_bridge": self._f_bridge.value.strip() or "vmbr0",
             "os_type": self._sec.get("os_type", "l26"),
             "start_on_create": self._sec.get("start_on_create", True),
         }
         self.dismiss(result)
 
-    def action_cancel(self) -> None:
-        self.dismiss(None)
+
+# ── Helper ────────────────────────────────────────────────────────
+
+# Component id -> config modal class; read-only, built once at import
+_MODAL_REGISTRY: Mapping[str, type[ModalScreen]] = MappingProxyType({
+    "proxmox": ProxmoxConfigModal,
+    "dns": DNSConfigModal,
+    "ipam": IPAMConfigModal,
+    "terraform": TerraformConfigModal,
+    "ansible": AnsibleConfigModal,
+    "ai": AIConfigModal,
+    "cloudflare": CloudflareConfigModal,
+    "defaults": DefaultsConfigModal,
+})
+
+
+def get_config_modal(comp_id: str, full_cfg: dict) -> ModalScreen | None:
+    """Return the appropriate config modal for a component."""
+    cls = _MODAL_REGISTRY.get(comp_id)
+    if cls is None:
+        return None
+    # The modals only read their section and return a new dict on save,
+    # so a read-only view stands in for a copy.
+    return cls(MappingProxyType(full_cfg.get(comp_id, {})))
@@ -1,8 +1,11 @@
 """Terraform integration for InfraForge VM provisioning."""
 
 import json
+import os
 import re
+import signal
 import subprocess
+import threading
 from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
@@ -908,6 +911,111 @@ class TerraformManager:
         except Exception as e:
             return False, str(e)
 
+    # Per-phase limits for terraform_deploy_streaming, in seconds.
+    _PHASE_TIMEOUTS = {"init": 120, "plan": 120, "apply": 300}
+
+    def terraform_deploy_streaming(
+        self,
+        deploy_dir: Path,
+        line_callback=None,
+        phase_callback=None,
+    ) -> tuple[bool, str, str]:
+        """Run init, plan and apply back-to-back, streaming their output.
+
+        Plan is written to ``tfplan`` and apply consumes it, so apply does
+        not refresh and re-plan against Proxmox a second time.  Each phase
+        runs in its own process group with its own timeout, so a hung
+        terraform (and any provider plugins it spawned) is killed as a
+        whole.  ``tfplan`` is removed once the run finishes.
+
+        Args:
+            deploy_dir: Deployment directory containing main.tf.
+            line_callback: Optional callback invoked with ``(phase, line)``.
+            phase_callback: Optional callback invoked with the phase name
+                (``"init"``, ``"plan"``, ``"apply"``) as each one starts.
+
+        Returns:
+            (success, phase, phase_output) — *phase* is the last phase
+            that started, and *phase_output* its output only.
+        """
+        init_cmd = ["terraform", "init", "-no-color", "-input=false"]
+        if self.plugin_mirror_dir.exists() and any(self.plugin_mirror_dir.iterdir()):
+            init_cmd.append(f"-plugin-dir={self.plugin_mirror_dir}")
+        phases = [
+            ("init", init_cmd),
+            ("plan", ["terraform", "plan", "-no-color", "-input=false",
+                      "-out=tfplan"]),
+            ("apply", ["terraform", "apply", "-no-color", "-input=false",
+                       "-auto-approve", "tfplan"]),
+        ]
+
+        phase = "init"
+        try:
+            for phase, cmd in phases:
+                if phase_callback:
+                    phase_callback(phase)
+                ok, output = self._run_phase_streaming(
+                    phase, cmd, deploy_dir, line_callback,
+                    self._PHASE_TIMEOUTS[phase],
+                )
+                if not ok:
+                    return False, phase, output
+            return True, phase, output
+        except FileNotFoundError:
+            return False, phase, "terraform not found in PATH"
+        except Exception as e:
+            return False, phase, str(e)
+        finally:
+            (deploy_dir / "tfplan").unlink(missing_ok=True)
+
+    @staticmethod
+    def _run_phase_streaming(
+        phase: str, cmd: list[str], cwd: Path, line_callback, timeout: int,
+    ) -> tuple[bool, str]:
+        """Run one terraform phase in its own session, killing the group on timeout."""
+        proc = subprocess.Popen(
+            cmd,
+            cwd=str(cwd),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            start_new_session=True,
+        )
+        timed_out = threading.Event()
+
+        def _kill_group():
+            timed_out.set()
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+        # A watchdog rather than a per-line check, so a phase that hangs
+        # without printing anything is still killed.
+        watchdog = threading.Timer(timeout, _kill_group)
+        watchdog.daemon = True
+        watchdog.start()
+        output_lines: list[str] = []
+        try:
+            for line in proc.stdout:
+                output_lines.append(line)
+                if line_callback:
+                    line_callback(phase, line.rstrip("\n"))
+            proc.wait()
+        finally:
+            watchdog.cancel()
+            # e.g. line_callback raised: don't leave terraform running
+            if proc.poll() is None:
+                _kill_group()
+                proc.wait()
+            proc.stdout.close()
+
+        if timed_out.is_set():
+            output_lines.append(f"\nterraform {phase} timed out after {timeout}s\n")
+            return False, "".join(output_lines)
+        return proc.returncode == 0, "".join(output_lines)
+
     # ------------------------------------------------------------------
     # Reusable template management
     # ------------------------------------------------------------------